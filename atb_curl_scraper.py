@@ -20,6 +20,12 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import re
 
+try:
+    import orjson
+    json_loads = orjson.loads  # C parser; orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    json_loads = json.loads
+
 
 class ATBCurlScraper:
     """ATB scraper using curl to bypass Cloudflare protection."""
@@ -255,7 +261,7 @@ class ATBCurlScraper:
                 
                 if json_match:
                     try:
-                        data = json.loads(json_match.group(1))
+                        data = json_loads(json_match.group(1))
                         products = self.extract_products_from_json(data, category_name)
                     except json.JSONDecodeError:
                         pass
@@ -2,6 +2,8 @@
 Simple configuration file for the grocery scraper.
 """
 
+import os
+
 # Database
 DATABASE_PATH = "grocery_data.db"
 
@@ -37,6 +39,7 @@ SCRAPING = {
     "wait_between_categories": 2,  # seconds
     "max_retries": 3,
     "headless": True,
+    "concurrency": 4,  # categories scraped in parallel, one browser context each
 }
 
 # Resource blocking patterns (for faster loading)
@@ -55,6 +58,11 @@ BLOCKED_RESOURCES = [
     r'\.css$',
 ]
 
+# Development playback: with SCRAPER_PLAYBACK=1, Playwright traffic goes through a
+# local HTTP recording/playback proxy (e.g. `http-playback-proxy playback --port 18080`)
+PLAYBACK_PROXY = (os.environ.get("SCRAPER_PLAYBACK_PROXY", "http://127.0.0.1:18080")
+                  if os.environ.get("SCRAPER_PLAYBACK") == "1" else None)
+
 # Browser settings
 BROWSER_ARGS = [
     "--disable-images",
@@ -62,6 +70,11 @@ BROWSER_ARGS = [
     "--disable-gpu",
     "--no-sandbox",
     "--disable-dev-shm-usage",
+    "--blink-settings=imagesEnabled=false",  # images are never requested, not just aborted
+    "--disable-background-networking",
+    "--disable-blink-features=AutomationControlled",
+    # Chromium honours only the last --disable-features, so keep these in one flag
+    "--disable-features=IsolateOrigins,site-per-process,TranslateUI",
 ]
 
 # URL patterns to exclude - store-specific
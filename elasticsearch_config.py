@@ -6,13 +6,43 @@ Provides configuration management, connection handling, and index operations.
 
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionError, TransportError, NotFoundError
-from typing import Dict, Any, Optional, List, Tuple, Union
+from typing import Dict, Any, Iterable, Optional, List, Tuple, Union
 import os
 import logging
 import time
 from dataclasses import dataclass, field
+from collections import deque
 from contextlib import contextmanager
 
+try:
+    from elasticsearch.serializer import OrjsonSerializer  # only defined when orjson is installed
+    _orjson_serializer = OrjsonSerializer()
+    # Plain and compatibility-mode JSON, so every request and response goes through orjson
+    ORJSON_SERIALIZERS = {
+        "application/json": _orjson_serializer,
+        "application/vnd.elasticsearch+json": _orjson_serializer,
+    }
+except ImportError:
+    ORJSON_SERIALIZERS = None
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+# Bulk action line for documents without an explicit _id; the index is passed to the _bulk request
+_BULK_INDEX_ACTION = b'{"index":{}}'
+
+
+def _preserialized_action(lines: Tuple[bytes, bytes]) -> Tuple[bytes, bytes]:
+    """expand_action_callback for (action, source) lines that are already serialized."""
+    return lines
+
+
 logger = logging.getLogger(__name__)
 
 class ElasticsearchConfigError(Exception):
@@ -50,8 +80,13 @@ class ElasticsearchConfig:
     ssl_show_warn: bool = os.getenv("ELASTICSEARCH_SSL_SHOW_WARN", "false").lower() == "true"
     
     # Performance settings
+    http_compress: bool = os.getenv("ELASTICSEARCH_HTTP_COMPRESS", "true").lower() == "true"
+    connections_per_node: int = int(os.getenv("ELASTICSEARCH_CONNECTIONS_PER_NODE", "25"))  # >= threads sharing the client
     bulk_chunk_size: int = int(os.getenv("ELASTICSEARCH_BULK_CHUNK_SIZE", "500"))
     bulk_timeout: str = os.getenv("ELASTICSEARCH_BULK_TIMEOUT", "60s")
+    bulk_thread_count: int = int(os.getenv("ELASTICSEARCH_BULK_THREADS", "4"))
+    bulk_max_chunk_bytes: int = int(os.getenv("ELASTICSEARCH_BULK_MAX_CHUNK_BYTES", str(50 * 1024 * 1024)))
+    bulk_queue_size: int = int(os.getenv("ELASTICSEARCH_BULK_QUEUE_SIZE", "4"))
     
     # Index settings
     default_index_name: str = os.getenv("ELASTICSEARCH_INDEX_NAME", "grocery_products")
@@ -65,6 +100,8 @@ class ElasticsearchConfig:
             "retry_on_timeout": self.retry_on_timeout,
             "verify_certs": self.verify_certs,
             "ssl_show_warn": self.ssl_show_warn,
+            "http_compress": self.http_compress,
+            "connections_per_node": self.connections_per_node,
         }
         
         # Add authentication if provided
@@ -73,6 +110,9 @@ class ElasticsearchConfig:
         elif self.username and self.password:
             config["http_auth"] = (self.username, self.password)
         
+        if ORJSON_SERIALIZERS:
+            config["serializers"] = ORJSON_SERIALIZERS
+        
         return config
     
     def validate(self) -> None:
@@ -88,6 +128,15 @@ class ElasticsearchConfig:
         
         if self.bulk_chunk_size <= 0:
             raise ElasticsearchConfigError("Bulk chunk size must be positive")
+        
+        if self.connections_per_node <= 0:
+            raise ElasticsearchConfigError("Connections per node must be positive")
+        
+        if self.bulk_thread_count <= 0:
+            raise ElasticsearchConfigError("Bulk thread count must be positive")
+        
+        if self.bulk_max_chunk_bytes <= 0:
+            raise ElasticsearchConfigError("Bulk max chunk bytes must be positive")
 
 
 # Default configuration instance
@@ -317,6 +366,14 @@ INDEX_SETTINGS = {
     }
 }
 
+# Index settings applied while a full sync bulk loads the index, restored afterwards
+BULK_LOAD_SETTINGS = {
+    "index.refresh_interval": "-1",
+    "index.number_of_replicas": 0,
+    "index.translog.durability": "async",
+    "index.translog.flush_threshold_size": "1gb",
+}
+
 class ElasticsearchManager:
     """Manager class for Elasticsearch operations with improved error handling and connection management."""
     
@@ -500,6 +557,148 @@ class ElasticsearchManager:
             logger.error(f"Unexpected bulk indexing error: {e}")
             return 0, []
     
+    def parallel_bulk_index_products(self,
+                                     products: Iterable[Dict[str, Any]],
+                                     thread_count: Optional[int] = None,
+                                     chunk_size: Optional[int] = None,
+                                     max_chunk_bytes: Optional[int] = None,
+                                     use_auto_id: bool = False,
+                                     indexed_ids: Optional[List[str]] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """Bulk index a stream of products with several bulk requests in flight.
+        
+        Args:
+            products: Iterable of product dictionaries, consumed lazily
+            thread_count: Number of concurrent bulk requests
+            chunk_size: Documents per bulk request
+            max_chunk_bytes: Upper bound on the size of one bulk request body
+            use_auto_id: Let Elasticsearch generate _id instead of using product_id,
+                which skips the per-document duplicate check (insert-only loads)
+            indexed_ids: If given, the product_id of every successfully indexed document that
+                was sent with its own _id is appended to it
+            
+        Returns:
+            Tuple of (success_count, failed_items)
+        """
+        from elasticsearch.helpers import parallel_bulk, streaming_bulk
+        
+        # (product_id, lines) sent but not yet answered, in order: parallel_bulk returns results
+        # in input order, so the head of the deque always belongs to the next result.
+        # product_id is None when Elasticsearch generates the _id.
+        in_flight = deque()
+        
+        # Action and source lines are serialized here, once, as NDJSON bytes; the bulk
+        # helper forwards bytes unchanged instead of building and dumping action dicts
+        def generate_lines():
+            for product in products:
+                try:
+                    product_id = None if use_auto_id else product.get('product_id')
+                    if product_id:
+                        action = b'{"index":{"_id":' + _json_dumps(product_id) + b'}}'
+                    else:
+                        action = _BULK_INDEX_ACTION
+                    lines = (action, _json_dumps(self._prepare_document(product)))
+                except Exception as e:
+                    logger.error(f"Error preparing document for product {product.get('name', 'Unknown')}: {e}")
+                    continue
+                in_flight.append((product_id, lines))
+                yield lines
+        
+        def record(ok, item, own_id):
+            nonlocal success
+            if ok:
+                success += 1
+                # Auto-generated ids can never match a product, so only own ids are recorded
+                if indexed_ids is not None and own_id:
+                    indexed_ids.append(next(iter(item.values())).get('_id'))
+            else:
+                failed.append(item)
+        
+        success = 0
+        failed = []
+        rejected = []
+        with self._ensure_connection() as es:
+            for ok, item in parallel_bulk(
+                es,
+                generate_lines(),
+                thread_count=thread_count or self.config.bulk_thread_count,
+                chunk_size=chunk_size or self.config.bulk_chunk_size,
+                max_chunk_bytes=max_chunk_bytes or self.config.bulk_max_chunk_bytes,
+                queue_size=self.config.bulk_queue_size,
+                expand_action_callback=_preserialized_action,
+                raise_on_error=False,
+                index=self.index_name,
+                timeout=self.config.bulk_timeout
+            ):
+                product_id, lines = in_flight.popleft()
+                # 429: the cluster was overloaded, not the document bad; retried below
+                if not ok and next(iter(item.values())).get('status') == 429:
+                    rejected.append((product_id, lines))
+                else:
+                    record(ok, item, product_id is not None)
+            
+            if rejected:
+                # parallel_bulk has no retries, so rejected documents get one sequential
+                # pass with streaming_bulk's exponential backoff on 429
+                logger.warning(f"Retrying {len(rejected)} documents rejected with 429")
+                # streaming_bulk reorders retried items, so own ids are matched by value
+                own_ids = {product_id for product_id, _ in rejected if product_id is not None}
+                results = streaming_bulk(
+                    es,
+                    (lines for _, lines in rejected),
+                    chunk_size=chunk_size or self.config.bulk_chunk_size,
+                    max_chunk_bytes=max_chunk_bytes or self.config.bulk_max_chunk_bytes,
+                    expand_action_callback=_preserialized_action,
+                    raise_on_error=False,
+                    max_retries=self.config.max_retries,
+                    initial_backoff=2,
+                    max_backoff=600,
+                    index=self.index_name,
+                    timeout=self.config.bulk_timeout
+                )
+                for ok, item in results:
+                    record(ok, item, next(iter(item.values())).get('_id') in own_ids)
+        
+        if failed:
+            logger.error(f"Parallel bulk indexing: {len(failed)} documents failed")
+            for i, error in enumerate(failed[:3]):
+                logger.error(f"Failed document {i+1}: {error}")
+            if len(failed) > 3:
+                logger.error(f"... and {len(failed) - 3} more failures")
+        else:
+            logger.info(f"Successfully bulk indexed {success} products")
+        
+        return success, failed
+    
+    @contextmanager
+    def bulk_load_settings(self, max_num_segments: Optional[int] = None):
+        """Disable refresh, replicas and per-request translog fsync for the duration of a bulk load.
+        
+        The settings the index had before are restored afterwards (keys that were not set
+        explicitly are reset to the cluster default), then the index is refreshed and
+        optionally force-merged.
+        
+        Args:
+            max_num_segments: Force-merge the index down to this many segments after loading
+        """
+        with self._ensure_connection() as es:
+            current = es.indices.get_settings(index=self.index_name, flat_settings=True)
+        explicit = current.get(self.index_name, {}).get("settings", {})
+        original = {key: explicit.get(key) for key in BULK_LOAD_SETTINGS}
+        
+        es.indices.put_settings(index=self.index_name, settings=BULK_LOAD_SETTINGS)
+        logger.info(f"Applied bulk load settings to {self.index_name}")
+        try:
+            yield
+        finally:
+            try:
+                es.indices.put_settings(index=self.index_name, settings=original)
+                es.indices.refresh(index=self.index_name)
+                if max_num_segments:
+                    es.indices.forcemerge(index=self.index_name, max_num_segments=max_num_segments)
+                logger.info(f"Restored index settings of {self.index_name}")
+            except Exception as e:
+                logger.error(f"Error restoring index settings of {self.index_name}: {e}")
+    
     def _prepare_document(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare product data for Elasticsearch indexing."""
         doc = product_data.copy()
@@ -12,17 +12,19 @@ import scrapy
 from itemloaders.processors import TakeFirst, MapCompose
 from scrapy.loader import ItemLoader
 
+VALID_STORES = frozenset({'ATB', 'Varus', 'Silpo', 'Metro'})
+PRICE_STRIP_RE = re.compile(r'[^\d,.]+')
+
 
 def clean_text(text):
     if not text:
         return ""
-    return ' '.join(text.strip().split())
+    return ' '.join(text.split())
 
 def clean_price(price_text):
     if not price_text:
         return None
-    clean = re.sub(r'[^\d,.]', '', str(price_text))
-    clean = clean.replace(',', '.')
+    clean = PRICE_STRIP_RE.sub('', str(price_text)).replace(',', '.')
     try:
         return float(clean)
     except:
@@ -53,9 +55,8 @@ def validate_url(value: str) -> str:
 
 def validate_store(value: str) -> str:
     """Validate store name."""
-    valid_stores = ['ATB', 'Varus', 'Silpo', 'Metro']
-    if value not in valid_stores:
-        raise ValueError(f"Invalid store: {value}. Must be one of {valid_stores}")
+    if value not in VALID_STORES:
+        raise ValueError(f"Invalid store: {value}. Must be one of {sorted(VALID_STORES)}")
     return value
 
 
@@ -1,4 +1,6 @@
 import logging
+import re
+import time
 
 from playwright.sync_api import sync_playwright
 from scrapy import signals
@@ -194,7 +196,6 @@ class RetryMiddleware:
         retry_attempt = request.meta.get('retry_attempt', 0)
         if retry_attempt > 0:
             delay = 2 ** (retry_attempt - 1)  # Exponential backoff: 1s, 2s, 4s
-            import time
             time.sleep(delay)
             spider.logger.info(f"Retry request after {delay}s delay: {request.url}")
         return None
@@ -221,44 +222,53 @@ class RetryMiddleware:
         return response
 
 
+# Headers specific to Ukrainian grocery stores
+DEFAULT_STORE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'uk-UA,uk;q=0.9,en-US;q=0.8,en;q=0.7,ru;q=0.6',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Store-specific headers, merged over the defaults once at import
+STORE_HEADERS = {
+    'silpo.ua': {
+        **DEFAULT_STORE_HEADERS,
+        'Accept': 'application/json, text/plain, */*',
+        'Origin': 'https://silpo.ua',
+        'Referer': 'https://silpo.ua/'
+    },
+    'varus.ua': {
+        **DEFAULT_STORE_HEADERS,
+        'Origin': 'https://varus.ua',
+        'Referer': 'https://varus.ua/'
+    },
+    'atbmarket.com': {
+        **DEFAULT_STORE_HEADERS,
+        'Origin': 'https://www.atbmarket.com',
+        'Referer': 'https://www.atbmarket.com/'
+    },
+    'zakaz.ua': {
+        **DEFAULT_STORE_HEADERS,
+        'Origin': 'https://metro.zakaz.ua',
+        'Referer': 'https://metro.zakaz.ua/'
+    },
+}
+
+# Single pass over the URL to find which store it belongs to
+STORE_HOST_RE = re.compile('|'.join(map(re.escape, STORE_HEADERS)))
+
+
 class HeadersMiddleware:
     """Middleware for setting appropriate headers for Ukrainian grocery stores"""
     
     def process_request(self, request, spider):
-        # Set headers specific to Ukrainian grocery stores
-        headers = {
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'uk-UA,uk;q=0.9,en-US;q=0.8,en;q=0.7,ru;q=0.6',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        
-        # Store-specific headers
-        if 'silpo.ua' in request.url:
-            headers.update({
-                'Accept': 'application/json, text/plain, */*',
-                'Origin': 'https://silpo.ua',
-                'Referer': 'https://silpo.ua/'
-            })
-        elif 'varus.ua' in request.url:
-            headers.update({
-                'Origin': 'https://varus.ua',
-                'Referer': 'https://varus.ua/'
-            })
-        elif 'atbmarket.com' in request.url:
-            headers.update({
-                'Origin': 'https://www.atbmarket.com',
-                'Referer': 'https://www.atbmarket.com/'
-            })
-        elif 'zakaz.ua' in request.url:
-            headers.update({
-                'Origin': 'https://metro.zakaz.ua',
-                'Referer': 'https://metro.zakaz.ua/'
-            })
+        match = STORE_HOST_RE.search(request.url)
+        headers = STORE_HEADERS[match.group(0)] if match else DEFAULT_STORE_HEADERS
         
         # Update request headers
         for key, value in headers.items():
@@ -28,21 +28,30 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Item fields cleaned by ValidationPipeline
+TEXT_FIELDS = ('name', 'category', 'subcategory', 'brand', 'description')
+URL_FIELDS = ('url', 'image_url')
+
+# Common words that don't affect product identity
+STOP_WORDS_RE = re.compile(r'\b(?:органічний|органический|fresh|свіжий|свежий)\b', re.IGNORECASE)
+
+# Everything except digits and decimal separators
+PRICE_STRIP_RE = re.compile(r'[^\d,.]+')
+
 
 # Simple utility functions
 def clean_text(text):
     """Clean text from extra spaces and newlines."""
     if not text:
         return ""
-    return ' '.join(text.strip().split())
+    return ' '.join(text.split())
 
 
 def clean_price(price_text):
     """Extract numeric price from text."""
     if not price_text:
         return None
-    clean = re.sub(r'[^\d,.]', '', str(price_text))
-    clean = clean.replace(',', '.')
+    clean = PRICE_STRIP_RE.sub('', str(price_text)).replace(',', '.')
     try:
         return float(clean)
     except:
@@ -85,6 +94,12 @@ def calculate_discount_percentage(original, current):
 
 # Simple database class
 class SimpleDB:
+    INSERT_PRODUCT_SQL = '''
+        INSERT OR REPLACE INTO products 
+        (name, price, category, subcategory, store, url, scraped_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def __init__(self):
         self.db_path = DATABASE_PATH
         self._init_db()
@@ -118,25 +133,30 @@ class SimpleDB:
         conn.close()
     
     def insert_products_batch(self, products):
+        rows = [(
+            product.name, product.price, product.category,
+            product.subcategory, product.store, product.url,
+            product.scraped_at.isoformat() if product.scraped_at else None
+        ) for product in products]
         conn = sqlite3.connect(self.db_path)
-        saved = 0
-        for product in products:
-            try:
-                conn.execute('''
-                    INSERT OR REPLACE INTO products 
-                    (name, price, category, subcategory, store, url, scraped_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    product.name, product.price, product.category,
-                    product.subcategory, product.store, product.url,
-                    product.scraped_at.isoformat() if product.scraped_at else None
-                ))
-                saved += 1
-            except Exception as e:
-                logger.error(f"Error saving product: {e}")
-        conn.commit()
-        conn.close()
-        return saved
+        try:
+            # Whole batch in one statement and one transaction
+            with conn:
+                conn.executemany(self.INSERT_PRODUCT_SQL, rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Batch insert failed, saving products one by one: {e}")
+            saved = 0
+            for row in rows:
+                try:
+                    conn.execute(self.INSERT_PRODUCT_SQL, row)
+                    saved += 1
+                except Exception as e:
+                    logger.error(f"Error saving product: {e}")
+            conn.commit()
+            return saved
+        finally:
+            conn.close()
     
     def insert_category(self, store, category, subcategory=None, category_url=None):
         conn = sqlite3.connect(self.db_path)
@@ -155,6 +175,9 @@ class SimpleDB:
 
 # Product class
 class Product:
+    __slots__ = ('name', 'price', 'category', 'subcategory', 'store', 'url',
+                 'image_url', 'brand', 'description', 'scraped_at')
+
     def __init__(self, name, price, category, subcategory, store, url, 
                  image_url=None, brand=None, description=None, scraped_at=None):
         self.name = name
@@ -209,8 +232,7 @@ class ValidationPipeline:
     def _clean_item_fields(self, adapter: ItemAdapter, spider: Spider) -> None:
         """Clean individual item fields."""
         # Clean text fields
-        text_fields = ['name', 'category', 'subcategory', 'brand', 'description']
-        for field in text_fields:
+        for field in TEXT_FIELDS:
             if adapter.get(field):
                 adapter[field] = clean_text(adapter[field])
         
@@ -239,8 +261,7 @@ class ValidationPipeline:
                 adapter['original_price'] = None
         
         # Clean URLs
-        url_fields = ['url', 'image_url']
-        for field in url_fields:
+        for field in URL_FIELDS:
             if adapter.get(field):
                 try:
                     adapter[field] = normalize_url(adapter[field])
@@ -256,7 +277,8 @@ class DeduplicationPipeline:
     """Pipeline for removing duplicate products within a session."""
     
     def __init__(self):
-        self.seen_products: Set[str] = set()
+        # 64-bit hashes of product IDs instead of the 32-char hex strings
+        self.seen_products: Set[int] = set()
         self.duplicate_count = 0
     
     def process_item(self, item: Dict[str, Any], spider: Spider) -> Dict[str, Any]:
@@ -272,12 +294,13 @@ class DeduplicationPipeline:
             )
             adapter['product_id'] = product_id
         
-        if product_id in self.seen_products:
+        key = hash(product_id)
+        if key in self.seen_products:
             self.duplicate_count += 1
             spider.logger.debug(f"Duplicate product found: {adapter.get('name')}")
             raise DropItem(f"Duplicate product: {product_id}")
         
-        self.seen_products.add(product_id)
+        self.seen_products.add(key)
         return item
     
     def close_spider(self, spider: Spider) -> None:
@@ -477,9 +500,7 @@ class PriceAnalysisPipeline:
         # Remove brand names, sizes, and other variations
         normalized = clean_text(name.lower())
         # Remove common words that don't affect product identity
-        stop_words = ['органічний', 'органический', 'fresh', 'свіжий', 'свежий']
-        for word in stop_words:
-            normalized = re.sub(rf'\b{word}\b', '', normalized, flags=re.IGNORECASE)
+        normalized = STOP_WORDS_RE.sub('', normalized)
         
         return normalized.strip()
     
@@ -3,20 +3,79 @@
 Base spider class with common functionality for all grocery store spiders.
 """
 
+import asyncio
+import functools
+import logging
+
 import scrapy
+from cssselect import parse as parse_css
+from parsel import css2xpath
+from parsel.csstranslator import HTMLTranslator
 from scrapy import Request
 from scrapy.http import Response
+from scrapy_playwright.page import PageMethod
 from typing import Dict, Any, Iterator, Optional, List
 from datetime import datetime
 import re
 import sqlite3
-from urllib.parse import urljoin
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from config import STORES, DATABASE_PATH, EXCLUDED_URL_PATTERNS
+from config import STORES, DATABASE_PATH, EXCLUDED_URL_PATTERNS, PLAYBACK_PROXY
+from ..utils import absolute_url, init_page_with_blocking
+
+
+_CSS_TRANSLATOR = HTMLTranslator()
+
+
+def _casefold(value):
+    """SQLite function: Unicode-aware case folding; the built-in lower() only folds ASCII."""
+    return value.casefold() if isinstance(value, str) else value
+
+
+def selectors_to_xpaths(selectors, suffix: str = '') -> List[str]:
+    """Translate one CSS selector or a list of them into XPath expressions.
+
+    The suffix pseudo-element (e.g. '::text') is applied to every group of a
+    selector list, and the groups are joined into a single XPath union. Groups
+    come from cssselect's parser, so commas inside attribute values or
+    functional pseudo-classes do not split a selector.
+    """
+    if not selectors:
+        return []
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    pseudo_element = parse_css(f'*{suffix}')[0].pseudo_element if suffix else None
+    xpaths = []
+    for selector in selectors:
+        groups = parse_css(selector)
+        if suffix:
+            for group in groups:
+                group.pseudo_element = pseudo_element
+        xpaths.append(' | '.join(_CSS_TRANSLATOR.selector_to_xpath(group, translate_pseudo_elements=True)
+                                 for group in groups))
+    return xpaths
+
+
+# Selectors shared by all stores, compiled once at import
+IMAGE_XPATHS = selectors_to_xpaths(['[data-autotestid="img"]', 'img'], '::attr(src)') + \
+    selectors_to_xpaths('img', '::attr(data-src)')
+PAGINATION_ITEM_XPATHS = selectors_to_xpaths(['.pagination-item.ng-star-inserted, .pagination-item',
+                                              '.Pagination__item'])
+PAGINATION_LAST_XPATH = css2xpath('[data-transaction-name="Pagination - Go To Last"]')
+PAGE_PARAM_RE = re.compile(r'[?&]page=(\d+)')
+PAGE_NUMBER_TEXT_XPATH = f"{css2xpath('a::text')} | {css2xpath('::text')}"
+# '::attr(...)' also matches descendants, e.g. an <a> inside a card or pagination wrapper
+TITLE_ATTR_XPATH = css2xpath('::attr(title)')
+HREF_ATTR_XPATH = css2xpath('::attr(href)')
+
+# Prices: thousands separators are whitespace, the decimal separator is ',' or '.'
+PRICE_SPACE_TABLE = str.maketrans('', '', ' \t\n\xa0\u202f')
+PRICE_RE = re.compile(r'\d+(?:[.,]\d+)?')
 
 
 class BaseGrocerySpider(scrapy.Spider):
@@ -37,6 +96,17 @@ class BaseGrocerySpider(scrapy.Spider):
 
     # Use Playwright for JavaScript sites
     use_playwright: bool = False
+    # Hand the Playwright page to callbacks (False lets the handler close it after rendering)
+    playwright_include_page: bool = True
+
+    # Number of persistent browser contexts requests are spread over (0 = default context)
+    playwright_context_pool_size: int = 0
+
+    # Number of products buffered before they are written in one transaction
+    product_flush_size: int = 128
+
+    # Number of category pages whose breadcrumbs are kept in memory
+    breadcrumb_cache_size: int = 1024
 
     # Category discovery settings (can be overridden)
     category_selectors: str = None  # CSS selector for category links
@@ -59,10 +129,42 @@ class BaseGrocerySpider(scrapy.Spider):
 
         # Initialize counters
         self.items_scraped = 0
+        self._product_buffer = []
+        self._breadcrumb_cache = OrderedDict()
+        self._default_page_methods = None
+
+        # Pending page-close tasks, kept referenced until done, with bounded concurrency
+        self._close_tasks = set()
+        self._close_sem = asyncio.BoundedSemaphore(32)
+
+        # Compile hot-path selectors to XPath once instead of on every card
+        self._card_xpaths = selectors_to_xpaths(getattr(self, 'product_card_selector', None))
+        self._card_union_xpath = ' | '.join(self._card_xpaths)
+        self._title_xpaths = selectors_to_xpaths(getattr(self, 'product_title_selector', None), '::text')
+        self._title_alt_xpaths = selectors_to_xpaths(getattr(self, 'product_title_alt_selector', None), '::text')
+        self._price_xpaths = selectors_to_xpaths(getattr(self, 'product_price_selectors', None), '::text')
+        self._link_xpaths = selectors_to_xpaths(getattr(self, 'product_link_selector', None), '::attr(href)')
+        self._pagination_xpaths = selectors_to_xpaths(getattr(self, 'pagination_selector', None))
+        self._breadcrumb_xpaths = selectors_to_xpaths(self.breadcrumb_selector, '::text')
+
+        # Store-specific excluded URL patterns as one alternation
+        excluded_patterns = EXCLUDED_URL_PATTERNS.get(self.store_name.lower(), [])
+        self._excluded_url_re = re.compile(
+            '|'.join(map(re.escape, dict.fromkeys(excluded_patterns))), re.IGNORECASE
+        ) if excluded_patterns else None
+        # Same patterns as SQL conditions, so stored categories are filtered by SQLite
+        self._excluded_url_params = [pattern.casefold() for pattern in dict.fromkeys(excluded_patterns)]
+        self._excluded_url_sql = ''.join(
+            ' AND instr(casefold(category_url), ?) = 0' for _ in self._excluded_url_params
+        )
 
     def init_db(self):
-        """Initialize database tables."""
-        conn = sqlite3.connect(self.db_path)
+        """Open the spider's database connection and initialize tables."""
+        # One connection for the spider's lifetime instead of one per query
+        self._db = conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.create_function('casefold', 1, _casefold, deterministic=True)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA mmap_size=268435456')
         conn.execute('''
                      CREATE TABLE IF NOT EXISTS products
                      (
@@ -130,36 +232,53 @@ class BaseGrocerySpider(scrapy.Spider):
                          )
                      ''')
         conn.commit()
-        conn.close()
 
-    def save_product(self, item: Dict[str, Any]):
-        """Save product to database."""
-        conn = sqlite3.connect(self.db_path)
+    def save_product(self, item: Dict[str, Any], scraped_at: str = None):
+        """Buffer product for saving; the buffer is flushed in batches."""
+        self._product_buffer.append((
+            item.get('name'),
+            item.get('price'),
+            item.get('category'),
+            item.get('subcategory'),
+            item.get('store'),
+            item.get('url'),
+            item.get('image_url'),
+            scraped_at or datetime.now().isoformat()
+        ))
+        if len(self._product_buffer) >= self.product_flush_size:
+            self.flush_products()
+
+    def flush_products(self):
+        """Write buffered products to database in a single transaction."""
+        if not self._product_buffer:
+            return
+        rows, self._product_buffer = self._product_buffer, []
+        conn = self._db
+        sql = '''
+            INSERT OR REPLACE INTO products 
+            (name, price, category, subcategory, store, url, image_url, scraped_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        '''
         try:
-            conn.execute('''
-                INSERT OR REPLACE INTO products 
-                (name, price, category, subcategory, store, url, image_url, scraped_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                item.get('name'),
-                item.get('price'),
-                item.get('category'),
-                item.get('subcategory'),
-                item.get('store'),
-                item.get('url'),
-                item.get('image_url'),
-                datetime.now().isoformat()
-            ))
-            conn.commit()
-            self.items_scraped += 1
+            with conn:
+                conn.executemany(sql, rows)
+            self.items_scraped += len(rows)
+            return
         except Exception as e:
-            self.logger.error(f"Error saving product: {e}")
-        finally:
-            conn.close()
+            self.logger.warning(f"Batch insert of {len(rows)} products failed, saving them one by one: {e}")
+        
+        # One bad row must not cost the rest of the batch
+        with conn:
+            for row in rows:
+                try:
+                    conn.execute(sql, row)
+                    self.items_scraped += 1
+                except Exception as e:
+                    self.logger.error(f"Error saving product {row[0]!r} ({row[5]}): {e}")
 
     def save_category(self, store: str, category: str, subcategory: str = None, category_url: str = None):
         """Save category to database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
             conn.execute('''
                 INSERT OR REPLACE INTO categories 
@@ -168,45 +287,55 @@ class BaseGrocerySpider(scrapy.Spider):
             ''', (store, category, subcategory, category_url))
             conn.commit()
         except Exception as e:
+            conn.rollback()
             self.logger.error(f"Error saving category: {e}")
-        finally:
-            conn.close()
 
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean text from extra spaces and newlines."""
         if not text:
             return ""
-        return ' '.join(text.strip().split())
+        return ' '.join(text.split())
 
     @staticmethod
     def clean_price(price_text: str) -> Optional[float]:
         """Extract numeric price from text."""
         if not price_text:
             return None
-        clean = re.sub(r'[^\d,.]', '', str(price_text))
-        clean = clean.replace(',', '.')
-        try:
-            return float(clean)
-        except:
+        match = PRICE_RE.search(str(price_text).translate(PRICE_SPACE_TABLE))
+        if not match:
             return None
+        return float(match.group().replace(',', '.'))
 
     def extract_category_from_breadcrumbs(self, response: Response) -> tuple:
         """Extract category and subcategory from breadcrumbs."""
-        if not self.breadcrumb_selector:
+        if not self._breadcrumb_xpaths:
             return None, None
 
-        breadcrumbs = response.css(self.breadcrumb_selector + '::text').getall()
+        # Every page of a category shares the same breadcrumbs
+        key = response.url.split('?')[0]
+        cached = self._breadcrumb_cache.get(key)
+        if cached:
+            self._breadcrumb_cache.move_to_end(key)
+            return cached
+
+        breadcrumbs = response.xpath(self._breadcrumb_xpaths[0]).getall()
         breadcrumbs = [self.clean_text(bc) for bc in breadcrumbs if bc.strip()]
 
         if len(breadcrumbs) >= 2:
             category = breadcrumbs[-2]  # Second to last is usually category
             subcategory = breadcrumbs[-1] if len(breadcrumbs) > 2 else None
-            return category, subcategory
+            result = category, subcategory
         elif len(breadcrumbs) == 1:
-            return breadcrumbs[0], None
+            result = breadcrumbs[0], None
+        else:
+            return None, None
 
-        return None, None
+        # Only cache extracted breadcrumbs; later pages may still render them
+        self._breadcrumb_cache[key] = result
+        if len(self._breadcrumb_cache) > self.breadcrumb_cache_size:
+            self._breadcrumb_cache.popitem(last=False)
+        return result
 
     def make_request(self, url: str, callback=None, meta: Optional[Dict] = None, **kwargs) -> Request:
         """Create request with common settings."""
@@ -218,21 +347,27 @@ class BaseGrocerySpider(scrapy.Spider):
         # Add Playwright settings if enabled
         if self.use_playwright:
             request_meta['playwright'] = True
-            request_meta['playwright_include_page'] = True
+            request_meta['playwright_include_page'] = self.playwright_include_page
+
+            # Pin the URL to one of a fixed set of reusable contexts
+            if self.playwright_context_pool_size and 'playwright_context' not in request_meta:
+                request_meta['playwright_context'] = f'{self.name}-{hash(url) % self.playwright_context_pool_size}'
+
+            # Route pages through the playback proxy in development runs
+            if PLAYBACK_PROXY:
+                request_meta.setdefault('playwright_context', 'playback')
+                request_meta['playwright_context_kwargs'] = {
+                    'proxy': {'server': PLAYBACK_PROXY},
+                    'ignore_https_errors': True,
+                }
 
             # Add resource blocking if not already specified
             if 'playwright_page_init_callback' not in request_meta:
-                from ..utils import init_page_with_blocking
                 request_meta['playwright_page_init_callback'] = init_page_with_blocking
 
             # Add default page methods if not specified
             if 'playwright_page_methods' not in request_meta:
-                from scrapy_playwright.page import PageMethod
-                request_meta['playwright_page_methods'] = [
-                    PageMethod('wait_for_load_state', 'domcontentloaded'),
-                    PageMethod('wait_for_timeout', 300),
-                    PageMethod('wait_for_function', self.get_wait_function(), timeout=5000),
-                ]
+                request_meta['playwright_page_methods'] = self.get_default_page_methods()
 
         # Add errback to ensure page cleanup
         if 'errback' not in kwargs:
@@ -245,6 +380,15 @@ class BaseGrocerySpider(scrapy.Spider):
             **kwargs
         )
 
+    def get_default_page_methods(self) -> list:
+        """Get default Playwright page methods, built once and shared by all requests."""
+        if self._default_page_methods is None:
+            self._default_page_methods = [
+                PageMethod('wait_for_load_state', 'domcontentloaded'),
+                PageMethod('wait_for_function', self.get_wait_function(), timeout=5000),
+            ]
+        return self._default_page_methods
+
     def get_wait_function(self) -> str:
         """Get JavaScript wait function for page loading. Override in subclasses."""
         return '''() => {
@@ -264,22 +408,29 @@ class BaseGrocerySpider(scrapy.Spider):
 
     def get_category_url_from_db(self, category_name: str) -> Optional[str]:
         """Get category URL from database by name."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
+            # Exact name is answered by the (store, category, subcategory) unique index
+            result = conn.execute('''
                 SELECT category_url
                 FROM categories
                 WHERE store = ?
-                  AND category LIKE ?
-            ''', (self.store_name, f'%{category_name}%'))
-            result = cursor.fetchone()
+                  AND category = ?
+                LIMIT 1
+            ''', (self.store_name, category_name)).fetchone()
+            if not result:
+                # Fall back to a substring match, stopping at the first row
+                result = conn.execute('''
+                    SELECT category_url
+                    FROM categories
+                    WHERE store = ?
+                      AND category LIKE ?
+                    LIMIT 1
+                ''', (self.store_name, f'%{category_name}%')).fetchone()
             return result[0] if result else None
         except Exception as e:
             self.logger.error(f"Error querying database: {e}")
             return None
-        finally:
-            conn.close()
 
     def parse(self, response: Response):
         """Default parse method - handles category discovery mode."""
@@ -321,7 +472,7 @@ class BaseGrocerySpider(scrapy.Spider):
 
     def check_categories_in_db(self) -> bool:
         """Check if categories exist in the database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
             cursor = conn.cursor()
             cursor.execute('''
@@ -334,12 +485,10 @@ class BaseGrocerySpider(scrapy.Spider):
         except Exception as e:
             self.logger.error(f"Error checking categories: {e}")
             return False
-        finally:
-            conn.close()
 
     def save_category_to_db(self, category_name: str, category_url: str, subcategory: str = None) -> bool:
         """Save category to database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
             cursor = conn.cursor()
             cursor.execute('''
@@ -350,14 +499,30 @@ class BaseGrocerySpider(scrapy.Spider):
             conn.commit()
             return cursor.rowcount > 0
         except Exception as e:
+            conn.rollback()
             self.logger.error(f"Error saving category: {e}")
             return False
-        finally:
-            conn.close()
+
+    def save_categories_to_db(self, categories: List[tuple]) -> int:
+        """Save (category_name, category_url) pairs in one transaction; return rows inserted."""
+        if not categories:
+            return 0
+        conn = self._db
+        try:
+            before = conn.total_changes
+            with conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO categories (store, category, category_url)
+                    VALUES (?, ?, ?)
+                ''', [(self.store_name, name, url) for name, url in categories])
+            return conn.total_changes - before
+        except Exception as e:
+            self.logger.error(f"Error saving {len(categories)} categories: {e}")
+            return 0
 
     def clear_categories_for_store(self):
         """Clear all existing categories for this store before discovery."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
             cursor = conn.cursor()
             cursor.execute('''
@@ -371,10 +536,9 @@ class BaseGrocerySpider(scrapy.Spider):
                 self.logger.info(f"[{self.store_name.upper()}] Cleared {deleted} existing categories")
             return deleted
         except Exception as e:
+            conn.rollback()
             self.logger.error(f"Error clearing categories: {e}")
             return 0
-        finally:
-            conn.close()
 
     def discover_categories(self, response: Response):
         """
@@ -398,21 +562,25 @@ class BaseGrocerySpider(scrapy.Spider):
         categories = response.css(f'{self.category_selectors}')
         self.logger.info(f"[{self.store_name.upper()}] Found {len(categories)} categories")
 
-        saved_count = 0
-        skipped_count = 0
+        # Menus repeat the same links; keep the first occurrence of each URL
+        discovered = {}
         for category in categories:
-            category_links = category.css('::attr(href)').get()
-            category_name = category.css('::text').get().strip()
-            full_url = urljoin(response.url, category_links)
+            # Read attribute and leading text straight from the lxml element
+            root = category.root
+            full_url = absolute_url(response.url, root.get('href'))
+            discovered.setdefault(full_url, (root.text or category.css('::text').get()).strip())
 
+        to_save = []
+        skipped_count = 0
+        for full_url, category_name in discovered.items():
             # Check if URL should be excluded
             if self.is_category_excluded(category_name, None, full_url):
                 skipped_count += 1
                 continue
+            to_save.append((category_name, full_url))
 
-            # Save to database
-            if self.save_category_to_db(category_name, full_url):
-                saved_count += 1
+        # Save to database
+        saved_count = self.save_categories_to_db(to_save)
 
         self.logger.info(
             f"[{self.store_name.upper()}] Category discovery complete. Saved {saved_count} categories to database")
@@ -425,27 +593,21 @@ class BaseGrocerySpider(scrapy.Spider):
 
     def parse_all_categories_from_db(self):
         """Parse all categories stored in database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._db
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
+            # Excluded URL patterns are applied in the WHERE clause
+            categories = conn.execute('''
                            SELECT category, subcategory, category_url
                            FROM categories
                            WHERE store = ?
                              AND category_url IS NOT NULL
                              AND category_url != ''
-                           ''', (self.store_name,))
-            categories = cursor.fetchall()
+                           ''' + self._excluded_url_sql,
+                           (self.store_name, *self._excluded_url_params)).fetchall()
 
             self.logger.info(f"[{self.store_name.upper()}] Found {len(categories)} categories in database")
 
-            excluded_count = 0
             for category_name, subcategory, category_url in categories:
-                # Check if category should be excluded
-                if self.is_category_excluded(category_name, subcategory, category_url):
-                    excluded_count += 1
-                    continue
-
                 self.logger.info(f"[{self.store_name.upper()}] Queuing category: {category_name} -> {category_url}")
                 yield self.make_request(
                     category_url,
@@ -453,40 +615,42 @@ class BaseGrocerySpider(scrapy.Spider):
                     meta={'category_name': category_name, 'subcategory': subcategory, 'page': 1}
                 )
 
-            if excluded_count > 0:
-                self.logger.info(f"[{self.store_name.upper()}] Excluded {excluded_count} categories based on filter")
-
         except Exception as e:
             self.logger.error(f"Error loading categories from database: {e}")
-        finally:
-            conn.close()
 
     def parse_category(self, response: Response):
         """Parse category page and extract products."""
         category_name = response.meta.get('category_name') or getattr(self, 'category_name', None) or 'Unknown'
         page = response.meta.get('page', 1)
 
-        self.logger.info(f"[{self.store_name.upper()}] Parsing category: {category_name} (page {page})")
-        self.logger.info(f"[{self.store_name.upper()}] Response URL: {response.url}")
-        self.logger.info(f"[{self.store_name.upper()}] Response status: {response.status}")
-        self.logger.info(f"[{self.store_name.upper()}] Response size: {len(response.text)} chars")
+        store = self.store_name.upper()
+
+        self.logger.info('[%s] Parsing category: %s (page %s)', store, category_name, page)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('[%s] Response URL: %s, status: %s', store, response.url, response.status)
+        self.logger.info('[%s] Response size: %d bytes', store, len(response.body))
 
         # Extract products using selectors
         product_cards = self.get_product_cards(response)
         products_found = 0
-        self.logger.info(f"[{self.store_name.upper()}] Total product cards found: {len(product_cards)}")
+        self.logger.info('[%s] Total product cards found: %d', store, len(product_cards))
+
+        # One timestamp for every product on the page
+        scraped_at = datetime.now()
+        scraped_at_iso = scraped_at.isoformat()
 
         for card in product_cards:
             product = self.extract_product(card, response, category_name)
             if product:
-                self.save_product(product)
+                product['scraped_at'] = scraped_at
+                self.save_product(product, scraped_at_iso)
                 yield product
                 products_found += 1
 
-        self.logger.info(f"[{self.store_name.upper()}] Found {products_found} products on page {page}")
+        self.logger.info('[%s] Found %d products on page %s', store, products_found, page)
 
         # Close Playwright page if included
-        yield from self.close_page_if_needed(response)
+        self.close_page_if_needed(response)
 
         # Handle pagination if on first page
         if page == 1:
@@ -494,25 +658,29 @@ class BaseGrocerySpider(scrapy.Spider):
 
     def get_product_cards(self, response: Response):
         """Get product cards from response. Override in subclasses if needed."""
-        product_cards = []
-        if isinstance(self.product_card_selector, list):
-            for selector in self.product_card_selector:
-                cards = response.css(selector)
-                product_cards.extend(cards)
-                self.logger.info(f"[{self.store_name.upper()}] Found {len(cards)} cards with selector: {selector}")
-        else:
-            product_cards = response.css(self.product_card_selector)
-            self.logger.info(f"[{self.store_name.upper()}] Found {len(product_cards)} cards with selector: {self.product_card_selector}")
+        if not self._card_union_xpath:
+            return []
+        # One union query; cards matched by several selectors are returned once
+        product_cards = response.xpath(self._card_union_xpath)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            selectors = self.product_card_selector
+            if isinstance(selectors, str):
+                selectors = [selectors]
+            self.logger.debug('[%s] Cards per selector: %s', self.store_name.upper(),
+                              {selector: len(response.xpath(xpath))
+                               for selector, xpath in zip(selectors, self._card_xpaths)})
         return product_cards
 
     def extract_product(self, card, response: Response, category_name: str) -> Optional[Dict[str, Any]]:
         """Extract product data from product card."""
         # Product name
-        name = card.css(f'{self.product_title_selector}::text').get()
-        if not name and hasattr(self, 'product_title_alt_selector'):
-            name = card.css(f'{self.product_title_alt_selector}::text').get()
+        name = None
+        for xpath in self._title_xpaths + self._title_alt_xpaths:
+            name = card.xpath(xpath).get()
+            if name:
+                break
         if not name:
-            name = card.css('::attr(title)').get()
+            name = card.attrib.get('title') or card.xpath(TITLE_ATTR_XPATH).get()
         name = self.clean_text(name)
 
         # Product price
@@ -544,52 +712,55 @@ class BaseGrocerySpider(scrapy.Spider):
     def extract_price_from_card(self, card) -> Optional[float]:
         """Extract price from product card."""
         price_text = None
-        if isinstance(self.product_price_selectors, list):
-            for price_selector in self.product_price_selectors:
-                price_text = card.css(f'{price_selector}::text').get()
-                if price_text:
-                    break
-        else:
-            price_text = card.css(f'{self.product_price_selectors}::text').get()
+        for xpath in self._price_xpaths:
+            price_text = card.xpath(xpath).get()
+            if price_text:
+                break
         return self.clean_price(price_text)
 
     def extract_url_from_card(self, card, response: Response) -> Optional[str]:
         """Extract product URL from card."""
         product_url = None
-        if self.product_link_selector:
-            product_url = card.css(f'{self.product_link_selector}::attr(href)').get()
+        if self._link_xpaths:
+            product_url = card.xpath(self._link_xpaths[0]).get()
         else:
             # Card itself might be a link
-            product_url = card.css('::attr(href)').get()
+            product_url = card.attrib.get('href') or card.xpath(HREF_ATTR_XPATH).get()
         
         if product_url:
-            product_url = urljoin(response.url, product_url)
+            product_url = absolute_url(response.url, product_url)
         return product_url
 
     def extract_image_url_from_card(self, card, response: Response) -> Optional[str]:
         """Extract image URL from card."""
-        image_url = card.css('[data-autotestid="img"]::attr(src)').get()
-        if not image_url:
-            image_url = card.css('img::attr(src)').get()
-        if not image_url:
-            image_url = card.css('img::attr(data-src)').get()
+        image_url = None
+        for xpath in IMAGE_XPATHS:
+            image_url = card.xpath(xpath).get()
+            if image_url:
+                break
         if image_url:
-            image_url = urljoin(response.url, image_url)
+            image_url = absolute_url(response.url, image_url)
         return image_url
 
     def close_page_if_needed(self, response: Response):
         """Close Playwright page if included."""
         page_obj = response.meta.get('playwright_page')
         if page_obj:
-            import asyncio
-            asyncio.create_task(page_obj.close())
+            task = asyncio.create_task(self._close_page(page_obj))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
             self.logger.debug(f"[{self.store_name.upper()}] Scheduled page close for {response.url}")
         return []
 
+    async def _close_page(self, page_obj):
+        """Close a Playwright page, limiting how many closes run at once."""
+        async with self._close_sem:
+            await page_obj.close()
+
     def handle_pagination(self, response: Response, category_name: str):
         """Handle pagination for categories."""
         # Get pagination block
-        pag_block = response.css(self.pagination_selector)
+        pag_block = response.xpath(self._pagination_xpaths[0]) if self._pagination_xpaths else None
 
         if pag_block:
             # Look for pagination items
@@ -603,23 +774,25 @@ class BaseGrocerySpider(scrapy.Spider):
                     self.logger.info(f"Found {last_page_num} total pages for {category_name}")
 
                     # Generate requests for remaining pages
-                    for page_num in range(2, last_page_num + 1):
-                        page_url = self.build_page_url(response.url, page_num)
-                        yield self.make_request(
+                    make_page_request = functools.partial(self.make_request, callback=self.parse_category)
+                    page_urls = self.build_page_urls(response.url, range(2, last_page_num + 1))
+                    for page_num, page_url in page_urls:
+                        yield make_page_request(
                             page_url,
-                            callback=self.parse_category,
                             meta={'category_name': category_name, 'page': page_num}
                         )
 
     def get_pagination_items(self, pag_block):
         """Get pagination items from pagination block. Override if needed."""
         # Try common pagination patterns
-        items = pag_block.css('.pagination-item.ng-star-inserted, .pagination-item')
-        if not items:
-            items = pag_block.css('.Pagination__item')
+        items = None
+        for xpath in PAGINATION_ITEM_XPATHS:
+            items = pag_block.xpath(xpath)
+            if items:
+                break
         if not items and self.store_name.lower() == 'varus':
             # Varus specific pagination
-            last_page_element = pag_block.css('[data-transaction-name="Pagination - Go To Last"]')
+            last_page_element = pag_block.xpath(PAGINATION_LAST_XPATH)
             return last_page_element
         return items
 
@@ -628,52 +801,48 @@ class BaseGrocerySpider(scrapy.Spider):
         page_numbers = []
         
         # Special case for Varus "Go To Last" button
-        if (len(pagination_items) == 1 and 
-            pagination_items[0].css('::attr(href)').get() and 
-            'page=' in pagination_items[0].css('::attr(href)').get()):
-            
-            last_page_url = pagination_items[0].css('::attr(href)').get()
-            page_match = re.search(r'[?&]page=(\d+)', last_page_url)
+        last_page_url = None
+        if len(pagination_items) == 1:
+            last_page_url = pagination_items[0].attrib.get('href') or pagination_items[0].xpath(HREF_ATTR_XPATH).get()
+        if last_page_url and 'page=' in last_page_url:
+            page_match = PAGE_PARAM_RE.search(last_page_url)
             if page_match:
                 return [int(page_match.group(1))]
         
-        # Standard pagination items
-        for item in pagination_items:
-            page_text = item.css('a::text').get()
-            if not page_text:
-                page_text = item.css('::text').get()
-            if page_text and page_text.strip().isdigit():
-                page_numbers.append(int(page_text.strip()))
+        # Standard pagination items: link and own texts of all items in one query
+        for page_text in pagination_items.xpath(PAGE_NUMBER_TEXT_XPATH).getall():
+            page_text = page_text.strip()
+            if page_text.isdigit():
+                page_numbers.append(int(page_text))
         
         return page_numbers
 
-    def build_page_url(self, current_url: str, page_num: int) -> str:
-        """Build URL for specific page number."""
-        if '?page=' in current_url:
-            return re.sub(r'page=\d+', f'page={page_num}', current_url)
-        else:
-            separator = '&' if '?' in current_url else '?'
-            return f"{current_url}{separator}page={page_num}"
+    def build_page_urls(self, current_url: str, page_numbers) -> Iterator[tuple]:
+        """Build (page number, URL) pairs, parsing the current URL only once."""
+        split = urlsplit(current_url)
+        query = dict(parse_qsl(split.query, keep_blank_values=True))
+        for page_num in page_numbers:
+            query['page'] = str(page_num)
+            yield page_num, urlunsplit(split._replace(query=urlencode(query)))
 
     def is_category_excluded(self, category: str, subcategory: str = None, url: str = None) -> bool:
         """Check if a URL should be excluded based on URL patterns."""
         # Only check URL patterns if URL is provided
-        if not url:
+        if not url or not self._excluded_url_re:
             return False
 
-        url_lower = url.lower()
-
         # Check store-specific URL patterns
-        store_url_patterns = EXCLUDED_URL_PATTERNS.get(self.store_name.lower(), [])
-        for pattern in store_url_patterns:
-            if pattern.lower() in url_lower:
-                self.logger.info(
-                    f"[{self.store_name.upper()}] Excluding category '{category}' - URL '{url}' (matched pattern: '{pattern}')")
-                return True
+        match = self._excluded_url_re.search(url)
+        if match:
+            self.logger.info(
+                f"[{self.store_name.upper()}] Excluding category '{category}' - URL '{url}' (matched pattern: '{match.group(0)}')")
+            return True
 
         return False
 
     def closed(self, reason):
         """Called when spider is closed."""
+        self.flush_products()
+        self._db.close()
         self.logger.info(f"Spider closed: {reason}")
         self.logger.info(f"Items scraped: {self.items_scraped}")
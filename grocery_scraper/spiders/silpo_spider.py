@@ -17,6 +17,12 @@ class SilpoSpider(BaseGrocerySpider):
     # Use Playwright for JavaScript rendering
     use_playwright = True
 
+    # Spread pages over a fixed pool of persistent browser contexts
+    playwright_context_pool_size = 16
+    custom_settings = {
+        'PLAYWRIGHT_MAX_CONTEXTS': 16,
+    }
+
     # Silpo-specific selectors (preserved from original)
     category_selectors = 'a[data-autotestid="ssr-menu-categories__link"]'
     product_card_selector = ['[data-autotestid="shop-silpo-product-card"]', '.product-card-list__item', '.product-card']
@@ -25,8 +31,9 @@ class SilpoSpider(BaseGrocerySpider):
     product_link_selector = '.product-card a, a'
     pagination_selector = '.pagination'
 
-    # Breadcrumb settings - target the link inside, not the whole li element
-    breadcrumb_selector = '.breadcrumbs-list__item breadcrumbs-list__item--active ng-star-inserted a'
+    # Breadcrumb settings - one combined selector, evaluated as a single union
+    breadcrumb_selector = ('.breadcrumbs-list__item a, .breadcrumbs-list__item.breadcrumbs-list__item--active, '
+                           '.breadcrumbs a, .breadcrumb a, [class*="breadcrumb"] a')
 
     def __init__(self, category_name=None, start_url=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3,12 +3,16 @@
 Varus spider with store-specific logic and selectors.
 """
 
-from urllib.parse import urljoin
+import re
 
 from scrapy.http import Response
+from scrapy_playwright.page import PageMethod
 
 from .base_spider import BaseGrocerySpider
-from ..utils import init_page_with_blocking
+from ..utils import init_page_with_blocking, absolute_url
+
+# Site-relative category path: not the home page, no query or fragment
+CATEGORY_PATH_RE = re.compile(r'/[^#?]+$')
 
 
 class VarusSpider(BaseGrocerySpider):
@@ -22,6 +26,16 @@ class VarusSpider(BaseGrocerySpider):
     # Use Playwright for JavaScript rendering
     use_playwright = True
 
+    # Callbacks only read the rendered HTML, so pages are closed by the handler
+    playwright_include_page = False
+
+    # Two persistent contexts of up to 8 pages each match CONCURRENT_REQUESTS (16);
+    # Scrapy keeps scheduling pagination ahead of the page cap
+    playwright_context_pool_size = 2
+    custom_settings = {
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': 8,
+    }
+
     # Varus-specific selectors - only main categories
     category_selectors = '.a-megamenu-item.a-megamenu-item--main.a-megamenu-item--has-child > a'
     product_card_selector = ['.sf-product-card', '.sf-product-card sf-product-card--out-of-stock-container']
@@ -61,6 +75,14 @@ class VarusSpider(BaseGrocerySpider):
             return hasProducts || hasCategories || hasContent || isEmpty || document.readyState === 'complete';
         }'''
 
+    def get_default_page_methods(self) -> list:
+        """Get Varus page methods that wait for Vue.js products, built once."""
+        if self._default_page_methods is None:
+            self._default_page_methods = [
+                PageMethod('wait_for_selector', '.sf-product-card, .sf-product-card__wrapper', timeout=3000),
+            ]
+        return self._default_page_methods
+
     def make_request(self, url: str, callback=None, meta=None, **kwargs):
         """Create request with Varus-specific Playwright settings."""
         self.logger.info(f"[VARUS] Creating custom request for: {url}")
@@ -69,14 +91,11 @@ class VarusSpider(BaseGrocerySpider):
         # Add Varus-specific Playwright settings if enabled
         if self.use_playwright:
             request_meta['playwright'] = True
-            request_meta['playwright_include_page'] = True
+            request_meta['playwright_include_page'] = self.playwright_include_page
             request_meta['playwright_page_init_callback'] = init_page_with_blocking
             
             # Wait for Vue.js products to load
-            from scrapy_playwright.page import PageMethod
-            request_meta['playwright_page_methods'] = [
-                PageMethod('wait_for_selector', '.sf-product-card, .sf-product-card__wrapper', timeout=3000),
-            ]
+            request_meta['playwright_page_methods'] = self.get_default_page_methods()
 
         return super().make_request(url, callback, request_meta, **kwargs)
 
@@ -106,26 +125,31 @@ class VarusSpider(BaseGrocerySpider):
         category_elements = response.css(self.category_selectors)
         self.logger.info(f"[VARUS] Found {len(category_elements)} category elements")
         
-        saved_count = 0
-        skipped_count = 0
+        # Menus repeat the same links; keep the first occurrence of each URL
+        discovered = {}
         for element in category_elements:
-            category_url = element.css('::attr(href)').get()
-            category_name = element.css('::text').get()
+            # Read attribute and leading text straight from the lxml element
+            root = element.root
+            category_url = root.get('href')
+            category_name = root.text or element.css('::text').get()
             
-            if category_url and category_url.startswith('/') and category_name:
-                full_url = urljoin(response.url, category_url)
+            if category_url and category_name and CATEGORY_PATH_RE.match(category_url):
+                full_url = absolute_url(response.url, category_url)
                 
                 # Clean and use the actual category name from the link text
-                category_name = self.clean_text(category_name)
-                
-                # Check if URL should be excluded
-                if self.is_category_excluded(category_name, None, full_url):
-                    skipped_count += 1
-                    continue
-                
-                # Save to database
-                if self.save_category_to_db(category_name, full_url):
-                    saved_count += 1
+                discovered.setdefault(full_url, self.clean_text(category_name))
+        
+        to_save = []
+        skipped_count = 0
+        for full_url, category_name in discovered.items():
+            # Check if URL should be excluded
+            if self.is_category_excluded(category_name, None, full_url):
+                skipped_count += 1
+                continue
+            to_save.append((category_name, full_url))
+        
+        # Save to database
+        saved_count = self.save_categories_to_db(to_save)
         
         self.logger.info(f"[VARUS] Category discovery complete. Saved {saved_count} categories to database")
         if skipped_count > 0:
@@ -133,42 +157,4 @@ class VarusSpider(BaseGrocerySpider):
         self.logger.info(f"[VARUS] Run spider again without discover_categories flag to parse products")
         
         # Close Playwright page if included
-        page_obj = response.meta.get('playwright_page')
-        if page_obj:
-            import asyncio
-            asyncio.create_task(page_obj.close())
-            self.logger.debug(f"[VARUS] Scheduled page close for {response.url}")
-
-
-
-# Playwright page initialization function for Varus
-async def init_varus_page(page, request):
-    """Initialize page to wait for Vue.js API responses."""
-    # Set up monitoring for the catalog API response
-    await page.evaluate('''
-        window.vueApiComplete = false;
-        window.apiCallCount = 0;
-        
-        // Monitor network responses using resource event
-        const originalFetch = window.fetch;
-        window.fetch = function(...args) {
-            const response = originalFetch.apply(this, arguments);
-            if (args[0] && args[0].includes && args[0].includes('vue_storefront_catalog_2')) {
-                window.apiCallCount++;
-                response.then(res => {
-                    if (res.status === 200) {
-                        // Wait a bit for Vue to process the response
-                        setTimeout(() => {
-                            window.vueApiComplete = true;
-                        }, 2000);
-                    }
-                }).catch(() => {});
-            }
-            return response;
-        };
-        
-        // Fallback: Mark as complete after 15 seconds regardless
-        setTimeout(() => {
-            window.vueApiComplete = true;
-        }, 15000);
-    ''')
+        self.close_page_if_needed(response)
@@ -3,33 +3,34 @@
 Utility functions for grocery scraper spiders.
 """
 
+import functools
 import re
 from typing import List
+from urllib.parse import urljoin, urlsplit
+
+# Media and tracking URLs blocked by init_page_with_blocking
+BLOCKED_URL_PATTERNS = (
+    r'\.jpg', r'\.jpeg', r'\.png', r'\.gif', r'\.webp', r'\.svg',
+    r'\.mp4', r'\.avi', r'\.mov', r'\.mp3', r'\.wav',
+    r'\.woff', r'\.woff2', r'\.ttf', r'\.eot',
+    r'google-analytics\.com', r'googletagmanager\.com',
+    r'doubleclick\.net', r'facebook\.com', r'googlesyndication\.com',
+    r'facebook\.net', r'twitter\.com', r'linkedin\.com'
+)
+# One alternation so each request URL is scanned once
+BLOCKED_URL_RE = re.compile('|'.join(BLOCKED_URL_PATTERNS), re.IGNORECASE)
+# Resource types never needed to parse the DOM; document, script, xhr and fetch still load
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet', 'websocket', 'manifest'})
 
 
 async def init_page_with_blocking(page, request):
     """Initialize page with resource blocking for better performance."""
 
     async def handle_route(route):
-        # Block media and tracking resources
-        blocked_patterns = [
-            r'\.jpg', r'\.jpeg', r'\.png', r'\.gif', r'\.webp', r'\.svg',
-            r'\.mp4', r'\.avi', r'\.mov', r'\.mp3', r'\.wav',
-            r'\.woff', r'\.woff2', r'\.ttf', r'\.eot',
-            r'google-analytics\.com', r'googletagmanager\.com',
-            r'doubleclick\.net', r'facebook\.com'
-        ]
-
-        url = route.request.url
-        resource_type = route.request.resource_type
-
-        # Block by resource type
-        if resource_type in ['image', 'media']:
-            await route.abort()
-            return
+        resource = route.request
 
-        # Block by URL pattern
-        if any(re.search(pattern, url, re.I) for pattern in blocked_patterns):
+        # Block by resource type, then by URL pattern
+        if resource.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(resource.url):
             await route.abort()
             return
 
@@ -38,6 +39,20 @@ async def init_page_with_blocking(page, request):
     await page.route('**/*', handle_route)
 
 
+@functools.lru_cache(maxsize=256)
+def url_origin(url: str) -> str:
+    """Get scheme://host of a URL; cached because one page resolves many links."""
+    split = urlsplit(url)
+    return f"{split.scheme}://{split.netloc}"
+
+
+def absolute_url(base_url: str, href: str) -> str:
+    """Resolve href against base_url, skipping full URL parsing for root-relative paths."""
+    if href and href[0] == '/' and href[:2] != '//':
+        return url_origin(base_url) + href
+    return urljoin(base_url, href)
+
+
 async def init_vue_page(page, request):
     """Initialize page to wait for Vue.js API responses."""
     # Set up monitoring for the catalog API response
@@ -71,21 +86,14 @@ async def init_vue_page(page, request):
 
 
 async def init_spa_page(page, request):
-    """Initialize page for Single Page Applications with resource blocking."""
-    # First apply resource blocking
+    """Initialize page for Single Page Applications with resource blocking.
+
+    Readiness is left to the request's page methods (wait_for_selector or the
+    spider's wait function); networkidle never settles on analytics-heavy pages.
+    """
     await init_page_with_blocking(page, request)
-    
-    # Then wait for SPA to load
-    await page.wait_for_load_state('networkidle')
 
 
 def get_blocked_resource_patterns() -> List[str]:
     """Get list of resource patterns to block for better performance."""
-    return [
-        r'\.jpg', r'\.jpeg', r'\.png', r'\.gif', r'\.webp', r'\.svg',
-        r'\.mp4', r'\.avi', r'\.mov', r'\.mp3', r'\.wav',
-        r'\.woff', r'\.woff2', r'\.ttf', r'\.eot',
-        r'google-analytics\.com', r'googletagmanager\.com',
-        r'doubleclick\.net', r'facebook\.com', r'googlesyndication\.com',
-        r'facebook\.net', r'twitter\.com', r'linkedin\.com'
-    ]
\ No newline at end of file
+    return list(BLOCKED_URL_PATTERNS)
\ No newline at end of file
@@ -6,6 +6,7 @@ No complex frameworks, just straightforward code.
 
 import asyncio
 import json
+import logging
 import re
 import sqlite3
 from abc import ABC, abstractmethod
@@ -13,24 +14,72 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
-import requests
-from playwright.async_api import async_playwright, Page, Route
+import aiohttp
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route
+
+try:
+    import orjson
+    json_loads = orjson.loads  # parses the raw bytes, no intermediate str
+except ImportError:
+    json_loads = json.loads
 
 # Import configuration
 from config import DATABASE_PATH, STORES, SCRAPING, BLOCKED_RESOURCES, BROWSER_ARGS
 
+logger = logging.getLogger(__name__)
+
+# Keep digits and dots, map ',' to '.'; run in the page so prices come back as numbers
+PARSE_PRICE_JS = '''const parsePrice = text => {
+                const clean = (text || '').replace(/[^\\d,.]/g, '').replace(/,/g, '.');
+                const price = clean ? Number(clean) : NaN;
+                return price > 0 ? price : null;
+            };'''
+
+# Resource blocking, compiled once instead of per intercepted request
+_BLOCK_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+_BLOCK_URL_RE = re.compile('|'.join(f'(?:{p})' for p in BLOCKED_RESOURCES), re.I)
+
 
 # ===== DATABASE =====
+# Kept as module-level strings so every batch hits the connection's statement cache.
+_INSERT_SQL = '''
+    INSERT INTO products 
+    (name, price, category, subcategory, store, url, scraped_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Update existing rows in place instead of delete + reinsert; needs a UNIQUE index on (name, store, url)
+_UPSERT_SQL = _INSERT_SQL + '''    ON CONFLICT(name, store, url) DO UPDATE SET
+        price = excluded.price,
+        category = excluded.category,
+        subcategory = excluded.subcategory,
+        scraped_at = excluded.scraped_at
+'''
+
+
 class Database:
     """Simple database handler."""
     
     def __init__(self, path: str = DATABASE_PATH):
         self.path = path
+        # One connection for the lifetime of the scraper
+        self.conn = self.connect()
         self.init_db()
     
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for bulk writes."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, one fsync less per commit
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")  # wait for concurrent scrapers instead of SQLITE_BUSY
+        return conn
+    
     def init_db(self):
         """Create tables if they don't exist."""
-        conn = sqlite3.connect(self.path)
+        conn = self.conn
+        conn.execute("PRAGMA journal_mode=WAL")  # persistent, stored in the database file
         conn.execute('''
             CREATE TABLE IF NOT EXISTS products (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,44 +93,156 @@ class Database:
                 UNIQUE(name, store, url)
             )
         ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_products_store_scraped_at ON products(store, scraped_at)")
         conn.commit()
-        conn.close()
+        if self.has_unique_index():
+            self.insert_sql = _UPSERT_SQL
+        else:
+            # Databases without the constraint keep one row per scrape (the price history)
+            logger.warning("No UNIQUE index on products(name, store, url), appending rows instead of upserting; "
+                           "run 'python scraper.py migrate-unique' to deduplicate and add it")
+            self.insert_sql = _INSERT_SQL
+    
+    def has_unique_index(self) -> bool:
+        """Check for the UNIQUE index on (name, store, url) the upsert conflicts on."""
+        conn = self.conn
+        for _, index, unique, *_ in conn.execute("PRAGMA index_list(products)").fetchall():
+            quoted = '"' + index.replace('"', '""') + '"'
+            columns = [row[2] for row in conn.execute(f"PRAGMA index_info({quoted})")]
+            if unique and columns == ['name', 'store', 'url']:
+                return True
+        return False
+    
+    def migrate_unique_index(self) -> bool:
+        """Collapse duplicate (name, store, url) rows to the newest one and add the UNIQUE index.
+        
+        Opt-in migration: it deletes older rows, and with them the price history they hold.
+        Returns False if the index can't be created.
+        """
+        if self.has_unique_index():
+            return True
+        
+        conn = self.conn
+        try:
+            with conn:
+                # NULL urls never conflict, so only duplicates with a url are collapsed
+                deleted = conn.execute('''
+                    DELETE FROM products WHERE url IS NOT NULL AND rowid NOT IN (
+                        SELECT MAX(rowid) FROM products WHERE url IS NOT NULL GROUP BY name, store, url
+                    )
+                ''').rowcount
+                conn.execute("CREATE UNIQUE INDEX idx_products_name_store_url ON products(name, store, url)")
+            logger.info(f"Removed {deleted} duplicate products and created the unique index")
+            self.insert_sql = _UPSERT_SQL
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Can't create unique index on products(name, store, url): {e}")
+            return False
+    
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+    
+    def to_rows(self, products: List[Dict], store: str) -> List[tuple]:
+        """Convert scraped products to insert rows."""
+        now = datetime.now().isoformat()
+        # Skip rows that would violate NOT NULL instead of failing the batch
+        return [(
+            product['name'],
+            product['price'],
+            product.get('category', 'Інше'),
+            product.get('subcategory'),
+            store,
+            product.get('url'),
+            now
+        ) for product in products if product.get('name') and product.get('price') is not None]
     
     def save_products(self, products: List[Dict], store: str):
-        """Save products to database."""
-        conn = sqlite3.connect(self.path)
-        cursor = conn.cursor()
+        """Save products to database in a single transaction."""
+        return self.save_products_batch(self.to_rows(products, store))
+    
+    def save_products_batch(self, rows: List[tuple]) -> int:
+        """Save prepared rows, from any number of stores, in a single transaction."""
+        conn = self.conn
+        try:
+            with conn:
+                conn.executemany(self.insert_sql, rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"Batch insert failed, saving products one by one: {e}")
         
         saved = 0
-        for product in products:
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO products 
-                    (name, price, category, subcategory, store, url, scraped_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    product['name'],
-                    product['price'],
-                    product.get('category', 'Інше'),
-                    product.get('subcategory'),
-                    store,
-                    product.get('url'),
-                    datetime.now().isoformat()
-                ))
-                saved += 1
-            except Exception as e:
-                print(f"Error saving product: {e}")
-        
-        conn.commit()
-        conn.close()
+        failed = 0
+        with conn:
+            for row in rows:
+                try:
+                    conn.execute(self.insert_sql, row)
+                    saved += 1
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error saving product {row[0]!r} ({row[4]}): {e}")
+        if failed:
+            logger.error(f"Failed to save {failed} of {len(rows)} products")
         return saved
 
 
+class DatabaseWriter:
+    """Single writer task that batches rows from all scrapers into large transactions."""
+    
+    batch_size = 10000
+    idle_flush = 0.5  # seconds without new rows before a partial batch is written
+    
+    def __init__(self, db: Database):
+        self.db = db
+        self.queue = None
+        self.task = None
+    
+    async def __aenter__(self):
+        self.queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        self.task = asyncio.create_task(self.run())
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.queue.put(None)
+        await self.task
+    
+    async def save_products(self, products: List[Dict], store: str) -> int:
+        """Queue products for the writer task and return how many were accepted."""
+        rows = self.db.to_rows(products, store)
+        for row in rows:
+            await self.queue.put(row)
+        return len(rows)
+    
+    async def run(self):
+        """Drain the queue, writing every batch_size rows or when it goes idle."""
+        rows = []
+        while True:
+            try:
+                row = await asyncio.wait_for(self.queue.get(), timeout=self.idle_flush)
+            except asyncio.TimeoutError:
+                self.flush(rows)
+                continue
+            
+            if row is None:
+                self.flush(rows)
+                return
+            
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                self.flush(rows)
+    
+    def flush(self, rows: List[tuple]):
+        """Write and clear pending rows."""
+        if rows:
+            self.db.save_products_batch(rows)
+            rows.clear()
+
+
 # ===== BASE SCRAPER =====
 class BaseScraper(ABC):
     """Base class for all scrapers."""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: DatabaseWriter):
         self.db = db
         self.store_name = ""
         self.base_url = ""
@@ -91,58 +252,65 @@ class BaseScraper(ABC):
         """Main scraping method."""
         pass
     
-    def clean_price(self, price_text: str) -> Optional[float]:
-        """Extract numeric price from text."""
-        if not price_text:
-            return None
-        clean = re.sub(r'[^\d,.]', '', price_text)
-        clean = clean.replace(',', '.')
-        try:
-            return float(clean)
-        except:
-            return None
-    
     def clean_text(self, text: str) -> str:
         """Clean text from extra spaces and newlines."""
         if not text:
             return ""
-        return ' '.join(text.strip().split())
+        return ' '.join(text.split())
 
 
 # ===== PLAYWRIGHT-BASED SCRAPER =====
 class PlaywrightScraper(BaseScraper):
     """Base for scrapers that need JavaScript rendering."""
     
+    # Shared browser, launched by GroceryScraper.start()
+    browser: Optional[Browser] = None
+    
     async def block_resources(self, route: Route):
         """Block unnecessary resources."""
-        resource_type = route.request.resource_type
-        url = route.request.url
+        request = route.request
+        if request.resource_type in _BLOCK_TYPES or _BLOCK_URL_RE.search(request.url):
+            return await route.abort()
+        return await route.continue_()
+    
+    async def new_context(self) -> BrowserContext:
+        """Create a browser context with resource blocking routed once for all its pages."""
+        context = await self.browser.new_context(viewport={"width": 1920, "height": 1080})
+        await context.route('**/*', self.block_resources)
+        return context
+    
+    async def scrape_categories(self, categories: List[Dict[str, str]]):
+        """Scrape categories concurrently, each worker with its own context and page."""
+        workers = max(1, min(SCRAPING['concurrency'], len(categories)))
         
-        # Block images, media, fonts, and tracking
-        if resource_type in ['image', 'media', 'font', 'stylesheet']:
-            await route.abort()
-            return
-            
-        # Block based on URL patterns from config
-        import re
-        for pattern in BLOCKED_RESOURCES:
-            if re.search(pattern, url, re.I):
-                await route.abort()
-                return
+        async def worker(chunk: List[Dict[str, str]]):
+            context = await self.new_context()
+            try:
+                page = await context.new_page()
                 
-        await route.continue_()
-    
-    async def setup_page(self, page: Page):
-        """Set up page with optimizations."""
-        await page.route('**/*', self.block_resources)
-        await page.set_viewport_size({"width": 1920, "height": 1080})
+                for cat in chunk:
+                    print(f"📁 Category: {cat['name']}")
+                    await page.goto(cat['url'], wait_until='domcontentloaded')
+                    
+                    products = await self.scrape_page(page)
+                    for product in products:
+                        product['category'] = cat['name']
+                    
+                    queued = await self.db.save_products(products, self.store_name)
+                    print(f"✅ Queued {queued} products")
+                    
+                    await asyncio.sleep(SCRAPING['wait_between_requests'])
+            finally:
+                await context.close()
+        
+        await asyncio.gather(*(worker(categories[i::workers]) for i in range(workers)))
 
 
 # ===== VARUS SCRAPER =====
 class VarusScraper(PlaywrightScraper):
     """Scraper for Varus store."""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: DatabaseWriter):
         super().__init__(db)
         self.store_name = "Varus"
         self.base_url = "https://varus.ua"
@@ -163,62 +331,46 @@ class VarusScraper(PlaywrightScraper):
     async def scrape_page(self, page: Page) -> List[Dict]:
         """Scrape products from current page."""
         try:
-            await page.wait_for_selector('.sf-product-card', timeout=10000)
+            # Cards are often server-rendered; don't stall empty categories for long
+            await page.locator('.sf-product-card').first.wait_for(timeout=2000)
         except:
             return []
         
-        products = await page.evaluate('''() => {
-            const cards = document.querySelectorAll('.sf-product-card');
-            return Array.from(cards).map(card => ({
-                name: card.querySelector('.sf-product-card__title')?.textContent?.trim(),
-                price: card.querySelector('.sf-price__regular, .sf-price__special')?.textContent?.trim(),
-                url: card.querySelector('a')?.href
-            })).filter(p => p.name && p.price);
+        return await page.evaluate('''() => {
+            ''' + PARSE_PRICE_JS + '''
+            const titleSel = '.sf-product-card__title';
+            const priceSel = '.sf-price__regular, .sf-price__special';
+            return Array.from(document.querySelectorAll('.sf-product-card'), card => {
+                const title = card.querySelector(titleSel), priceEl = card.querySelector(priceSel);
+                if (!title || !priceEl) return null;
+                const name = title.textContent.trim(), price = parsePrice(priceEl.textContent);
+                if (!name || !price) return null;
+                const link = card.querySelector('a');
+                return {name, price, url: link && link.href};
+            }).filter(Boolean);
         }''')
-        
-        # Clean prices
-        for product in products:
-            product['price'] = self.clean_price(product['price'])
-        
-        return [p for p in products if p['price']]
     
     async def scrape(self, category: Optional[str] = None):
         """Scrape Varus store."""
         print(f"🛒 Scraping {self.store_name}...")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=SCRAPING['headless'],
-                args=BROWSER_ARGS
-            )
-            page = await browser.new_page()
-            await self.setup_page(page)
-            
+        context = await self.new_context()
+        try:
+            page = await context.new_page()
             categories = await self.get_categories(page)
-            if category:
-                categories = [c for c in categories if category.lower() in c['name'].lower()]
-            
-            for cat in categories:
-                print(f"📁 Category: {cat['name']}")
-                await page.goto(cat['url'], wait_until='domcontentloaded')
-                
-                products = await self.scrape_page(page)
-                for product in products:
-                    product['category'] = cat['name']
-                
-                saved = self.db.save_products(products, self.store_name)
-                print(f"✅ Saved {saved} products")
-                
-                await asyncio.sleep(SCRAPING['wait_between_requests'])
-            
-            await browser.close()
+        finally:
+            await context.close()
+        if category:
+            categories = [c for c in categories if category.lower() in c['name'].lower()]
+        
+        await self.scrape_categories(categories)
 
 
 # ===== SILPO SCRAPER =====
 class SilpoScraper(PlaywrightScraper):
     """Scraper for Silpo store."""
     
-    def __init__(self, db: Database):
+    def __init__(self, db: DatabaseWriter):
         super().__init__(db)
         self.store_name = "Silpo"
         self.base_url = "https://silpo.ua"
@@ -226,23 +378,24 @@ class SilpoScraper(PlaywrightScraper):
     async def scrape_page(self, page: Page) -> List[Dict]:
         """Scrape products from current page."""
         try:
-            await page.wait_for_selector('[class*="product-card"]', timeout=10000)
+            # Cards are often server-rendered; don't stall empty categories for long
+            await page.locator('[class*="product-card"]').first.wait_for(timeout=2000)
         except:
             return []
         
-        products = await page.evaluate('''() => {
-            const cards = document.querySelectorAll('[class*="product-card"]');
-            return Array.from(cards).map(card => ({
-                name: card.querySelector('[class*="product-title"], [class*="product-name"]')?.textContent?.trim(),
-                price: card.querySelector('[class*="price"]')?.textContent?.trim(),
-                url: card.querySelector('a')?.href
-            })).filter(p => p.name && p.price);
+        return await page.evaluate('''() => {
+            ''' + PARSE_PRICE_JS + '''
+            const titleSel = '[class*="product-title"], [class*="product-name"]';
+            const priceSel = '[class*="price"]';
+            return Array.from(document.querySelectorAll('[class*="product-card"]'), card => {
+                const title = card.querySelector(titleSel), priceEl = card.querySelector(priceSel);
+                if (!title || !priceEl) return null;
+                const name = title.textContent.trim(), price = parsePrice(priceEl.textContent);
+                if (!name || !price) return null;
+                const link = card.querySelector('a');
+                return {name, price, url: link && link.href};
+            }).filter(Boolean);
         }''')
-        
-        for product in products:
-            product['price'] = self.clean_price(product['price'])
-        
-        return [p for p in products if p['price']]
     
     async def scrape(self, category: Optional[str] = None):
         """Scrape Silpo store."""
@@ -260,35 +413,16 @@ class SilpoScraper(PlaywrightScraper):
         if category:
             categories = [c for c in categories if category.lower() in c['name'].lower()]
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=SCRAPING['headless'],
-                args=BROWSER_ARGS
-            )
-            page = await browser.new_page()
-            await self.setup_page(page)
-            
-            for cat in categories:
-                print(f"📁 Category: {cat['name']}")
-                await page.goto(cat['url'], wait_until='domcontentloaded')
-                
-                products = await self.scrape_page(page)
-                for product in products:
-                    product['category'] = cat['name']
-                
-                saved = self.db.save_products(products, self.store_name)
-                print(f"✅ Saved {saved} products")
-                
-                await asyncio.sleep(SCRAPING['wait_between_requests'])
-            
-            await browser.close()
+        await self.scrape_categories(categories)
 
 
-# ===== ATB SCRAPER (using requests) =====
+# ===== ATB SCRAPER (using aiohttp) =====
 class ATBScraper(BaseScraper):
     """Scraper for ATB store using direct API calls."""
     
-    def __init__(self, db: Database):
+    prefetch_pages = 8  # pages requested concurrently per category
+    
+    def __init__(self, db: DatabaseWriter):
         super().__init__(db)
         self.store_name = "ATB"
         self.base_url = "https://www.atbmarket.com"
@@ -305,42 +439,47 @@ class ATBScraper(BaseScraper):
             {"name": "Алкоголь", "id": "alkogol"},
         ]
     
-    def scrape_category(self, category: Dict[str, str]) -> List[Dict]:
-        """Scrape products from category."""
+    async def fetch_page(self, session: aiohttp.ClientSession, category: Dict[str, str], page: int) -> Optional[Dict]:
+        """Fetch one page of a category from the API."""
+        async with session.get(
+            self.api_url,
+            params={"category": category['id'], "page": page}
+        ) as response:
+            if response.status != 200:
+                return None
+            return json_loads(await response.read())
+    
+    async def scrape_category(self, session: aiohttp.ClientSession, category: Dict[str, str]) -> List[Dict]:
+        """Scrape products from category, fetching a window of pages at a time."""
         products = []
-        page = 1
+        start = 1
         
         while True:
-            try:
-                response = requests.get(
-                    self.api_url,
-                    params={"category": category['id'], "page": page},
-                    headers={"User-Agent": "Mozilla/5.0"},
-                    timeout=30
-                )
-                
-                if response.status_code != 200:
-                    break
-                
-                data = response.json()
-                if not data.get('products'):
-                    break
-                
-                for item in data['products']:
-                    products.append({
-                        'name': self.clean_text(item.get('name', '')),
-                        'price': float(item.get('price', 0)),
-                        'category': category['name'],
-                        'url': f"{self.base_url}/product/{item.get('id')}"
-                    })
-                
-                page += 1
+            pages = await asyncio.gather(
+                *(self.fetch_page(session, category, start + i) for i in range(self.prefetch_pages)),
+                return_exceptions=True
+            )
+            
+            for data in pages:
+                if isinstance(data, Exception):
+                    print(f"Error: {data}")
+                    return products
+                if not data or not data.get('products'):
+                    return products
                 
-            except Exception as e:
-                print(f"Error: {e}")
-                break
-        
-        return products
+                try:
+                    for item in data['products']:
+                        products.append({
+                            'name': self.clean_text(item.get('name', '')),
+                            'price': float(item.get('price', 0)),
+                            'category': category['name'],
+                            'url': f"{self.base_url}/product/{item.get('id')}"
+                        })
+                except Exception as e:
+                    print(f"Error: {e}")
+                    return products
+            
+            start += self.prefetch_pages
     
     async def scrape(self, category: Optional[str] = None):
         """Scrape ATB store."""
@@ -350,11 +489,17 @@ class ATBScraper(BaseScraper):
         if category:
             categories = [c for c in categories if category.lower() in c['name'].lower()]
         
-        for cat in categories:
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(total=30),
+            headers={"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate"}
+        ) as session:
+            results = await asyncio.gather(*(self.scrape_category(session, cat) for cat in categories))
+        
+        for cat, products in zip(categories, results):
             print(f"📁 Category: {cat['name']}")
-            products = self.scrape_category(cat)
-            saved = self.db.save_products(products, self.store_name)
-            print(f"✅ Saved {saved} products")
+            queued = await self.db.save_products(products, self.store_name)
+            print(f"✅ Queued {queued} products")
 
 
 # ===== MAIN SCRAPER MANAGER =====
@@ -363,10 +508,13 @@ class GroceryScraper:
     
     def __init__(self):
         self.db = Database()
+        self.writer = DatabaseWriter(self.db)
+        self.playwright = None
+        self.browser = None
         self.scrapers = {
-            'varus': VarusScraper(self.db),
-            'silpo': SilpoScraper(self.db),
-            'atb': ATBScraper(self.db),
+            'varus': VarusScraper(self.writer),
+            'silpo': SilpoScraper(self.writer),
+            'atb': ATBScraper(self.writer),
         }
     
     async def scrape_store(self, store: str, category: Optional[str] = None):
@@ -376,16 +524,54 @@ class GroceryScraper:
             print(f"Available stores: {', '.join(self.scrapers.keys())}")
             return
         
-        await self.scrapers[store].scrape(category)
+        scraper = self.scrapers[store]
+        if isinstance(scraper, PlaywrightScraper):
+            await self.start()
+        
+        async with self.writer:
+            await scraper.scrape(category)
     
     async def scrape_all(self, category: Optional[str] = None):
-        """Scrape all stores."""
-        for store_name, scraper in self.scrapers.items():
-            print(f"\n{'='*50}")
-            print(f"Starting {store_name.upper()}")
-            print('='*50)
-            await scraper.scrape(category)
-            print(f"✅ {store_name.upper()} complete!")
+        """Scrape all stores concurrently."""
+        print(f"\n{'='*50}")
+        print(f"Starting {', '.join(name.upper() for name in self.scrapers)}")
+        print('='*50)
+        await self.start()
+        async with self.writer:
+            # Let every store finish before the writer stops, even if one of them fails
+            results = await asyncio.gather(*(scraper.scrape(category) for scraper in self.scrapers.values()),
+                                           return_exceptions=True)
+        failed = []
+        for name, result in zip(self.scrapers, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Scraping {name} failed", exc_info=result)
+                failed.append(name)
+        if failed:
+            print(f"❌ Failed stores: {', '.join(failed)}")
+        else:
+            print("✅ All stores complete!")
+    
+    async def start(self):
+        """Launch the browser shared by all Playwright scrapers."""
+        if self.browser is not None:
+            return
+        
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(
+            headless=SCRAPING['headless'],
+            args=BROWSER_ARGS
+        )
+        for scraper in self.scrapers.values():
+            if isinstance(scraper, PlaywrightScraper):
+                scraper.browser = self.browser
+    
+    async def close(self):
+        """Release shared resources."""
+        if self.browser is not None:
+            await self.browser.close()
+            await self.playwright.stop()
+            self.browser = self.playwright = None
+        self.db.close()
 
 
 # ===== COMMAND LINE INTERFACE =====
@@ -393,8 +579,6 @@ async def main():
     """Main entry point."""
     import sys
     
-    scraper = GroceryScraper()
-    
     # Parse command line arguments
     args = sys.argv[1:]
     
@@ -404,15 +588,22 @@ async def main():
         print("  python scraper.py varus                  # Scrape only Varus")
         print("  python scraper.py silpo 'Молочні'        # Scrape Silpo dairy")
         print("  python scraper.py all 'М\\'ясо'           # Scrape meat from all stores")
+        print("  python scraper.py migrate-unique         # Deduplicate products and add the upsert index")
         return
     
     store = args[0].lower()
     category = args[1] if len(args) > 1 else None
     
-    if store == 'all':
-        await scraper.scrape_all(category)
-    else:
-        await scraper.scrape_store(store, category)
+    scraper = GroceryScraper()
+    try:
+        if store == 'migrate-unique':
+            scraper.db.migrate_unique_index()
+        elif store == 'all':
+            await scraper.scrape_all(category)
+        else:
+            await scraper.scrape_store(store, category)
+    finally:
+        await scraper.close()
 
 
 if __name__ == "__main__":
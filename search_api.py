@@ -4,14 +4,68 @@ Refactored Flask-based REST API for searching grocery products using Elasticsear
 Demonstrates better separation of concerns and maintainability.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from elasticsearch import NotFoundError, helpers
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
-from enum import Enum
+from collections import OrderedDict
+import hashlib
 import os
+import re
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_last_timestamp: Tuple[int, str] = (0, '')
+
+
+def _now_iso() -> str:
+    """Current local time in ISO format, formatted at most once per second."""
+    global _last_timestamp
+    second = int(time.time())
+    if _last_timestamp[0] != second:
+        _last_timestamp = (second, datetime.fromtimestamp(second).isoformat())
+    return _last_timestamp[1]
+
+
+def _int(args: Any, key: str, default: int, lo: int, hi: int) -> int:
+    """Read an integer parameter clamped to [lo, hi], using the default for missing or malformed values."""
+    try:
+        value = int(args.get(key))
+    except (TypeError, ValueError):
+        return default
+    return max(lo, min(hi, value))
+
+
+# Cache-Control sent with ETagged responses from these endpoints
+_CACHE_CONTROL = {
+    '/api/search': 'max-age=10, private',
+    '/api/stats': 'max-age=10, private',
+}
+
+# Per-request fields left out of ETags: timing, cache flags and counters, timestamps
+_ETAG_VOLATILE_KEYS = frozenset({'search_cache', 'facet_cache', 'product_cache', 'timestamp'})
+_ETAG_VOLATILE_QUERY_INFO = frozenset({'took', 'cache_hit'})
+
+
+def _etag_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the part of a response body that identifies its content for the ETag."""
+    payload = {key: value for key, value in data.items() if key not in _ETAG_VOLATILE_KEYS}
+    if 'query_info' in payload:
+        payload['query_info'] = {key: value for key, value in payload['query_info'].items()
+                                 if key not in _ETAG_VOLATILE_QUERY_INFO}
+    return payload
+
+
+# Queries containing these stems get too many false positives with fuzzy matching
+_FUZZY_EXCLUDE_RE = re.compile('|'.join(map(re.escape, ['творог', 'молок', 'масл'])))
 
 # Configuration Classes
 class SearchConfig:
@@ -22,6 +76,7 @@ class SearchConfig:
     EXACT_WORD_BOOST = 7
     WORD_MATCH_BOOST = 4
     FUZZY_MATCH_BOOST = 2
+    DIS_MAX_TIE_BREAKER = 0.2  # share of the non-best clause scores added to the best
     
     # Fuzzy matching settings
     MIN_QUERY_LENGTH_FOR_FUZZY = 5
@@ -30,6 +85,8 @@ class SearchConfig:
     # Pagination
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 1000
+    MAX_RESULT_WINDOW = 10000  # index.max_result_window: from + size may not exceed it
+    TRACK_TOTAL_HITS = 10000  # count exactly up to here, then report a lower bound
     
     # Price ranges for facets
     PRICE_RANGES = [
@@ -44,30 +101,108 @@ class SearchConfig:
     STORE_AGG_SIZE = 10
     CATEGORY_AGG_SIZE = 15
     BRAND_AGG_SIZE = 15
+    
+    # Search result cache
+    CACHE_SIZE = 2048
+    CACHE_TTL = 30  # seconds
+    FACET_CACHE_TTL = 60  # seconds; facets are shared by every page of a query
+    # Stable preference so size=0 aggregations hit the same shard copies' request cache
+    CACHE_PREFERENCE = "grocery-api-aggs"
+    
+    # Product-by-id cache; misses expire sooner so new products show up quickly
+    PRODUCT_CACHE_SIZE = 10000
+    PRODUCT_CACHE_TTL = 300  # seconds
+    PRODUCT_MISS_TTL = 60  # seconds
+    
+    # Searches accepted by one /api/msearch call
+    MAX_MSEARCH_SIZE = 20
+    
+    # Document fields returned by /api/search unless the client asks for others
+    SEARCH_SOURCE_FIELDS = [
+        "name", "price", "store", "category", "subcategory", "url", "image_url",
+        "brand", "original_price", "discount_percentage", "has_discount",
+        "in_stock", "rating", "scraped_at", "product_id"
+    ]
+    COMPARE_SOURCE_FIELDS = ["name", "price", "store", "url"]
+    
+    # Price comparison result limits
+    COMPARE_DEFAULT_LIMIT = 200
+    COMPARE_MAX_LIMIT = 500
+    
+    # Documents per scroll batch when streaming results
+    SCAN_BATCH_SIZE = 500
+
+
+# Sort option name -> Elasticsearch sort clause
+_SORT_CONFIGS: Dict[str, List[Dict[str, Any]]] = {
+    "relevance": [{"_score": {"order": "desc"}}],
+    "price_asc": [{"price": {"order": "asc"}}, {"_score": {"order": "desc"}}],
+    "price_desc": [{"price": {"order": "desc"}}, {"_score": {"order": "desc"}}],
+    "name": [{"name.raw": {"order": "asc"}}, {"_score": {"order": "desc"}}],
+    "rating": [{"rating": {"order": "desc", "missing": "_last"}}, {"_score": {"order": "desc"}}],
+    "newest": [{"scraped_at": {"order": "desc"}}, {"_score": {"order": "desc"}}]
+}
 
 
-class SortOption(Enum):
-    """Available sort options."""
-    RELEVANCE = "relevance"
-    PRICE_ASC = "price_asc"
-    PRICE_DESC = "price_desc"
-    NAME = "name"
-    RATING = "rating"
-    NEWEST = "newest"
+_HIGHLIGHT_CONFIG: Dict[str, Any] = {
+    "fields": {
+        "name": {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]},
+        "description": {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]}
+    }
+}
+
+# Store and category breakdown for /api/stats
+_STATS_AGG_QUERY: Dict[str, Any] = {
+    "size": 0,
+    "aggs": {
+        "stores": {"terms": {"field": "store", "size": 10}},
+        "categories": {"terms": {"field": "category.raw", "size": 10}}
+    }
+}
+
+
+# Request parameter -> value parser
+_FILTER_PARSERS = {
+    'stores': lambda value: value.split(','),
+    'categories': lambda value: value.split(','),
+    'brands': lambda value: value.split(','),
+    'price_min': float,
+    'price_max': float,
+    'min_rating': float,
+    'has_discount': lambda value: value.lower() == 'true',
+    'in_stock': lambda value: value.lower() == 'true',
+}
+
+# Filter name -> (query type, index field); price and rating are range filters
+_FILTER_FIELDS = {
+    'stores': ('terms', 'store'),
+    'categories': ('terms', 'category.raw'),
+    'brands': ('terms', 'brand.raw'),
+    'has_discount': ('term', 'has_discount'),
+    'in_stock': ('term', 'in_stock'),
+}
 
 
-@dataclass
 class SearchRequest:
     """Validated search request parameters."""
-    query: str = ""
-    page: int = 1
-    per_page: int = SearchConfig.DEFAULT_PAGE_SIZE
-    sort_by: SortOption = SortOption.RELEVANCE
-    filters: Dict[str, Any] = None
     
-    def __post_init__(self):
-        if self.filters is None:
-            self.filters = {}
+    __slots__ = ('query', 'page', 'per_page', 'sort_by', 'filters', 'fields')
+    
+    def __init__(
+        self,
+        query: str = "",
+        page: int = 1,
+        per_page: int = SearchConfig.DEFAULT_PAGE_SIZE,
+        sort_by: str = "relevance",
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None
+    ):
+        self.query = query
+        self.page = page
+        self.per_page = per_page
+        self.sort_by = sort_by
+        self.filters = filters if filters is not None else {}
+        self.fields = fields
 
 
 class FilterParser:
@@ -78,34 +213,33 @@ class FilterParser:
         """Parse filter parameters from request arguments."""
         filters = {}
         
-        # List filters
-        for field in ['stores', 'categories', 'brands']:
-            if args.get(field):
-                filters[field] = args[field].split(',')
-        
-        # Numeric filters
-        for field in ['price_min', 'price_max', 'min_rating']:
-            if args.get(field):
+        for field, parse in _FILTER_PARSERS.items():
+            value = args.get(field)
+            if value:
                 try:
-                    filters[field] = float(args[field])
+                    filters[field] = parse(value)
                 except ValueError:
                     pass  # Skip invalid values
         
-        # Boolean filters
-        for field in ['has_discount', 'in_stock']:
-            if args.get(field):
-                filters[field] = args[field].lower() == 'true'
-        
         return filters
 
 
 class SearchQueryBuilder:
     """Builds Elasticsearch queries with a fluent interface."""
     
-    def __init__(self, config: SearchConfig = SearchConfig()):
+    def __init__(self, config: SearchConfig = SearchConfig(), static_tail: Optional[Dict[str, Any]] = None):
         self.config = config
+        # highlight and aggs never change per request; reuse a prebuilt copy when given
+        if static_tail is None:
+            static_tail = self.build_static_tail()
         self.query: Dict[str, Any] = {
             "query": {"bool": {"must": [], "should": [], "filter": []}},
+            **static_tail
+        }
+    
+    def build_static_tail(self) -> Dict[str, Any]:
+        """Build the request-independent highlight and aggregations sections."""
+        return {
             "highlight": SearchQueryBuilder._get_highlight_config(),
             "aggs": self._get_aggregations_config()
         }
@@ -113,16 +247,21 @@ class SearchQueryBuilder:
     def add_search_query(self, query_text: str) -> 'SearchQueryBuilder':
         """Add search query with relevance scoring."""
         if not query_text or not query_text.strip():
-            self.query["query"]["bool"]["must"].append({"match_all": {}})
+            # Browsing without a query: an empty bool matches everything, nothing to score
             return self
         
-        should_clauses = [
-            self._exact_phrase_clause(query_text),
-            self._exact_term_clause(query_text),
-            self._exact_word_clause(query_text),
-            self._word_match_clause(query_text),
-            SearchQueryBuilder._multi_field_clause(query_text)
-        ]
+        # One dis_max scores the best exact/word match instead of summing
+        # five independent clauses over the same terms
+        should_clauses = [{
+            "dis_max": {
+                "tie_breaker": self.config.DIS_MAX_TIE_BREAKER,
+                "queries": [
+                    self._exact_phrase_clause(query_text),
+                    self._exact_term_clause(query_text),
+                    self._word_fields_clause(query_text)
+                ]
+            }
+        }]
         
         # Add fuzzy matching for longer queries
         if self._should_use_fuzzy(query_text):
@@ -138,18 +277,12 @@ class SearchQueryBuilder:
         if not filters:
             return self
         
-        for field in ['stores', 'categories', 'brands', 'has_discount', 'in_stock']:
+        for field, (kind, es_field) in _FILTER_FIELDS.items():
             if field in filters:
-                if field == 'stores':
-                    self._add_terms_filter(filters[field], "store")
-                elif field == 'categories':
-                    self._add_terms_filter(filters[field], "category.raw")
-                elif field == 'brands':
-                    self._add_terms_filter(filters[field], "brand.raw")
-                elif field == 'has_discount':
-                    self._add_term_filter(filters[field], "has_discount")
-                elif field == 'in_stock':
-                    self._add_term_filter(filters[field], "in_stock")
+                if kind == 'terms':
+                    self._add_terms_filter(filters[field], es_field)
+                else:
+                    self._add_term_filter(filters[field], es_field)
         
         # Handle price range
         if 'price_min' in filters or 'price_max' in filters:
@@ -161,18 +294,14 @@ class SearchQueryBuilder:
         
         return self
     
-    def add_sorting(self, sort_by: SortOption) -> 'SearchQueryBuilder':
+    def add_sorting(self, sort_by: str) -> 'SearchQueryBuilder':
         """Add sorting configuration."""
-        sort_configs = {
-            SortOption.RELEVANCE: [{"_score": {"order": "desc"}}],
-            SortOption.PRICE_ASC: [{"price": {"order": "asc"}}, {"_score": {"order": "desc"}}],
-            SortOption.PRICE_DESC: [{"price": {"order": "desc"}}, {"_score": {"order": "desc"}}],
-            SortOption.NAME: [{"name.raw": {"order": "asc"}}, {"_score": {"order": "desc"}}],
-            SortOption.RATING: [{"rating": {"order": "desc", "missing": "_last"}}, {"_score": {"order": "desc"}}],
-            SortOption.NEWEST: [{"scraped_at": {"order": "desc"}}, {"_score": {"order": "desc"}}]
-        }
-        
-        self.query["sort"] = sort_configs.get(sort_by, sort_configs[SortOption.RELEVANCE])
+        self.query["sort"] = _SORT_CONFIGS.get(sort_by, _SORT_CONFIGS["relevance"])
+        return self
+    
+    def add_source_fields(self, fields: List[str]) -> 'SearchQueryBuilder':
+        """Limit the returned document fields."""
+        self.query["_source"] = {"includes": fields}
         return self
     
     def build(self) -> Dict[str, Any]:
@@ -200,37 +329,17 @@ class SearchQueryBuilder:
             }
         }
     
-    def _exact_word_clause(self, query: str) -> Dict[str, Any]:
-        return {
-            "match": {
-                "name.exact": {
-                    "query": query,
-                    "operator": "and",
-                    "boost": self.config.EXACT_WORD_BOOST
-                }
-            }
-        }
-    
-    def _word_match_clause(self, query: str) -> Dict[str, Any]:
-        return {
-            "match": {
-                "name": {
-                    "query": query,
-                    "operator": "and",
-                    "boost": self.config.WORD_MATCH_BOOST
-                }
-            }
-        }
-    
-    @staticmethod
-    def _multi_field_clause(query: str) -> Dict[str, Any]:
+    def _word_fields_clause(self, query: str) -> Dict[str, Any]:
         return {
             "multi_match": {
                 "query": query,
-                "fields": ["brand^2", "category^1.5", "subcategory^1.2", "description"],
+                "fields": [
+                    f"name.exact^{self.config.EXACT_WORD_BOOST}",
+                    f"name^{self.config.WORD_MATCH_BOOST}",
+                    "brand^2", "category^1.5", "subcategory^1.2", "description"
+                ],
                 "type": "best_fields",
-                "operator": "and",
-                "fuzziness": "0"
+                "operator": "and"
             }
         }
     
@@ -251,8 +360,7 @@ class SearchQueryBuilder:
             return False
         
         # Exclude specific problematic queries
-        excluded_terms = ['творог', 'молок', 'масл']
-        return not any(term in query.lower() for term in excluded_terms)
+        return not _FUZZY_EXCLUDE_RE.search(query.lower())
     
     def _add_terms_filter(self, values: List[str], field: str):
         """Add terms filter."""
@@ -284,12 +392,7 @@ class SearchQueryBuilder:
     @staticmethod
     def _get_highlight_config() -> Dict[str, Any]:
         """Get highlight configuration."""
-        return {
-            "fields": {
-                "name": {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]},
-                "description": {"pre_tags": ["<mark>"], "post_tags": ["</mark>"]}
-            }
-        }
+        return _HIGHLIGHT_CONFIG
     
     def _get_aggregations_config(self) -> Dict[str, Any]:
         """Get aggregations configuration."""
@@ -354,6 +457,50 @@ class ResponseFormatter:
         return facets
 
 
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Return a live cached value, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit counters."""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
 class ProductSearchService:
     """Service layer for product search operations."""
     
@@ -361,83 +508,135 @@ class ProductSearchService:
         self.es_manager = es_manager
         self.config = config
         self.query_builder = SearchQueryBuilder(config)
+        self._static_tail = self.query_builder.build_static_tail()
         self.formatter = ResponseFormatter()
+        self.cache = QueryCache(config.CACHE_SIZE, config.CACHE_TTL)
+        self.facet_cache = QueryCache(config.CACHE_SIZE, config.FACET_CACHE_TTL)
+        self.product_cache = QueryCache(config.PRODUCT_CACHE_SIZE, config.PRODUCT_CACHE_TTL)
         self.logger = logging.getLogger(__name__)
     
     def search(self, search_request: SearchRequest) -> Dict[str, Any]:
         """Execute product search."""
+        cached = self._cached_search(search_request)
+        if cached is not None:
+            return cached
+        
         try:
-            # Build query
-            query = (SearchQueryBuilder(self.config)
-                    .add_search_query(search_request.query)
-                    .add_filters(search_request.filters)
-                    .add_sorting(search_request.sort_by)
-                    .build())
+            # Facets only depend on the query and filters, so paging through
+            # results reuses them and fetches hits alone.
+            body = self._build_search_body(search_request)
+            del body["aggs"]
+            facets = self.facet_cache.get(ProductSearchService._facet_key(search_request))
             
-            # Calculate pagination
-            from_index = (search_request.page - 1) * search_request.per_page
+            if facets is not None:
+                response = self.es_manager.es.search(
+                    index=self.es_manager.index_name,
+                    body=body
+                )
+                return self._search_result(search_request, response, facets)
             
-            # Execute search
-            response = self.es_manager.es.search(
+            facets_body = {
+                "size": 0,
+                "query": body["query"],
+                "aggs": self._static_tail["aggs"]
+            }
+            response = self.es_manager.es.msearch(
                 index=self.es_manager.index_name,
-                body=query,
-                size=search_request.per_page,
-                from_=from_index
+                searches=[
+                    {}, body,
+                    {"request_cache": True, "preference": self.config.CACHE_PREFERENCE}, facets_body
+                ]
             )
+            hits_response, facets_response = response['responses']
+            if 'error' in hits_response:
+                raise RuntimeError(hits_response['error'])
             
-            # Process results
-            products = ProductSearchService._process_products(response['hits']['hits'])
-            pagination = ProductSearchService._build_pagination(
-                response['hits']['total']['value'],
-                search_request.page,
-                search_request.per_page
-            )
-            facets = self.formatter.extract_facets(response.get('aggregations', {}))
-            query_info = {
-                'query': search_request.query,
-                'filters': search_request.filters,
-                'sort_by': search_request.sort_by.value,
-                'took': response.get('took', 0)
-            }
+            if 'error' in facets_response:
+                self.logger.error(f"Facets error: {facets_response['error']}")
+                facets = {}
+            else:
+                facets = self.formatter.extract_facets(facets_response.get('aggregations', {}))
+                self.facet_cache.set(ProductSearchService._facet_key(search_request), facets)
+            return self._search_result(search_request, hits_response, facets)
             
-            return self.formatter.format_search_response(
-                products, pagination, facets, query_info
+        except Exception as search_error:
+            self.logger.error(f"Search error: {search_error}")
+            return self._search_error(search_error)
+    
+    def search_with_suggestions(self, search_request: SearchRequest, size: int = 10) -> Dict[str, Any]:
+        """Run a search and its autocomplete suggestions in one msearch round trip."""
+        try:
+            response = self.es_manager.es.msearch(
+                index=self.es_manager.index_name,
+                searches=[
+                    {}, self._build_search_body(search_request),
+                    {}, ProductSearchService._build_suggest_body(search_request.query, size)
+                ]
             )
+            search_response, suggest_response = response['responses']
+            
+            if 'error' in search_response:
+                self.logger.error(f"Search error: {search_response['error']}")
+                results = self._search_error(search_response['error'])
+            else:
+                results = self._search_result(search_request, search_response)
+            
+            if 'error' in suggest_response:
+                self.logger.error(f"Suggestion error: {suggest_response['error']}")
+                suggestions = []
+            else:
+                suggestions = ProductSearchService._extract_suggestions(suggest_response)
+            
+            results['suggestions'] = suggestions
+            return results
             
         except Exception as search_error:
             self.logger.error(f"Search error: {search_error}")
-            return self.formatter.format_search_response(
-                [], 
-                self._empty_pagination(), 
-                {}, 
-                {'error': str(search_error)}
+            results = self._search_error(search_error)
+            results['suggestions'] = []
+            return results
+    
+    def multi_search(self, search_requests: List[SearchRequest]) -> List[Dict[str, Any]]:
+        """Execute several searches, sending the uncached ones in a single msearch."""
+        results: List[Optional[Dict[str, Any]]] = [
+            self._cached_search(search_request) for search_request in search_requests
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        searches = []
+        for i in pending:
+            searches.append({})
+            searches.append(self._build_search_body(search_requests[i]))
+        
+        try:
+            response = self.es_manager.es.msearch(
+                index=self.es_manager.index_name,
+                searches=searches
             )
+            for i, item in zip(pending, response['responses']):
+                if 'error' in item:
+                    self.logger.error(f"Search error: {item['error']}")
+                    results[i] = self._search_error(item['error'])
+                else:
+                    results[i] = self._search_result(search_requests[i], item)
+                    
+        except Exception as search_error:
+            self.logger.error(f"Search error: {search_error}")
+            for i in pending:
+                results[i] = self._search_error(search_error)
+        
+        return results
     
     def get_suggestions(self, query: str, size: int = 10) -> List[str]:
         """Get autocomplete suggestions for search queries."""
         try:
-            suggest_query = {
-                "suggest": {
-                    "product_suggest": {
-                        "prefix": query,
-                        "completion": {
-                            "field": "suggest",
-                            "size": size
-                        }
-                    }
-                }
-            }
-            
             response = self.es_manager.es.search(
                 index=self.es_manager.index_name,
-                body=suggest_query
+                body=ProductSearchService._build_suggest_body(query, size)
             )
-            
-            suggestions = []
-            for option in response['suggest']['product_suggest'][0]['options']:
-                suggestions.append(option['text'])
-            
-            return suggestions
+            return ProductSearchService._extract_suggestions(response)
             
         except Exception as e:
             self.logger.error(f"Suggestion error: {e}")
@@ -445,58 +644,33 @@ class ProductSearchService:
     
     def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific product by ID."""
+        cached = self.product_cache.get(product_id)
+        if cached is not None:
+            # False marks a product known not to exist
+            return cached or None
+        
         try:
             response = self.es_manager.es.get(
                 index=self.es_manager.index_name,
                 id=product_id
             )
+            self.product_cache.set(product_id, response['_source'])
             return response['_source']
             
+        except NotFoundError:
+            self.product_cache.set(product_id, False, ttl=self.config.PRODUCT_MISS_TTL)
+            return None
+            
         except Exception as e:
             self.logger.error(f"Get product error: {e}")
             return None
     
-    def compare_prices(self, product_name: str) -> List[Dict[str, Any]]:
+    def compare_prices(self, product_name: str, limit: int = SearchConfig.COMPARE_DEFAULT_LIMIT) -> List[Dict[str, Any]]:
         """Compare prices for similar products across stores."""
         try:
-            # Build comparison query
-            query = {
-                "query": {
-                    "bool": {
-                        "should": [
-                            {
-                                "match_phrase": {
-                                    "name": {
-                                        "query": product_name,
-                                        "boost": 10
-                                    }
-                                }
-                            },
-                            {
-                                "match": {
-                                    "name": {
-                                        "query": product_name,
-                                        "operator": "and",
-                                        "boost": 5
-                                    }
-                                }
-                            },
-                            {
-                                "match": {
-                                    "name": {
-                                        "query": product_name,
-                                        "fuzziness": "1",
-                                        "boost": 2
-                                    }
-                                }
-                            }
-                        ],
-                        "minimum_should_match": 1
-                    }
-                },
-                "sort": [{"price": {"order": "asc"}}],
-                "size": 2000
-            }
+            query = ProductSearchService._build_compare_query(product_name)
+            query["_source"] = {"includes": self.config.COMPARE_SOURCE_FIELDS}
+            query["size"] = limit
             
             response = self.es_manager.es.search(
                 index=self.es_manager.index_name,
@@ -515,23 +689,43 @@ class ProductSearchService:
             self.logger.error(f"Price comparison error: {e}")
             return []
     
+    def iter_compare_prices(self, product_name: str) -> Iterator[Dict[str, Any]]:
+        """Yield every matching product, cheapest first, without a result size cap."""
+        return self.iter_all(
+            ProductSearchService._build_compare_query(product_name),
+            source=self.config.COMPARE_SOURCE_FIELDS,
+            preserve_order=True
+        )
+    
+    def iter_all(
+        self,
+        query: Dict[str, Any],
+        source: Optional[List[str]] = None,
+        preserve_order: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the _source of every hit, fetched from a scroll in batches."""
+        for hit in helpers.scan(
+            self.es_manager.es,
+            index=self.es_manager.index_name,
+            query=query,
+            size=self.config.SCAN_BATCH_SIZE,
+            scroll='1m',
+            preserve_order=preserve_order,
+            _source=source
+        ):
+            yield hit['_source']
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics."""
         try:
             stats = self.es_manager.es.count(index=self.es_manager.index_name)
             
             # Get store and category breakdown
-            agg_query = {
-                "size": 0,
-                "aggs": {
-                    "stores": {"terms": {"field": "store", "size": 10}},
-                    "categories": {"terms": {"field": "category.raw", "size": 10}}
-                }
-            }
-            
             agg_response = self.es_manager.es.search(
                 index=self.es_manager.index_name,
-                body=agg_query
+                body=_STATS_AGG_QUERY,
+                request_cache=True,
+                preference=self.config.CACHE_PREFERENCE
             )
             
             return {
@@ -545,7 +739,10 @@ class ProductSearchService:
                     for bucket in agg_response['aggregations']['categories']['buckets']
                 ],
                 'index_name': self.es_manager.index_name,
-                'timestamp': datetime.now().isoformat()
+                'search_cache': self.cache.stats(),
+                'facet_cache': self.facet_cache.stats(),
+                'product_cache': self.product_cache.stats(),
+                'timestamp': _now_iso()
             }
             
         except Exception as e:
@@ -560,12 +757,159 @@ class ProductSearchService:
             return {
                 'status': 'healthy' if es_status else 'unhealthy',
                 'elasticsearch': 'connected' if es_status else 'disconnected',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _now_iso()
             }
             
         except Exception:
             raise
     
+    def _build_search_body(self, search_request: SearchRequest) -> Dict[str, Any]:
+        """Build the search body, including pagination, for search and msearch."""
+        body = (SearchQueryBuilder(self.config, self._static_tail)
+                .add_search_query(search_request.query)
+                .add_filters(search_request.filters)
+                .add_sorting(search_request.sort_by)
+                .add_source_fields(search_request.fields or self.config.SEARCH_SOURCE_FIELDS)
+                .build())
+        body["track_total_hits"] = self.config.TRACK_TOTAL_HITS
+        body["size"] = search_request.per_page
+        body["from"] = (search_request.page - 1) * search_request.per_page
+        return body
+    
+    def _cached_search(self, search_request: SearchRequest) -> Optional[Dict[str, Any]]:
+        """Return a formatted response from the result cache, or None."""
+        cached = self.cache.get(ProductSearchService._cache_key(search_request))
+        if cached is None:
+            return None
+        
+        products, pagination, facets = cached
+        query_info = {
+            'query': search_request.query,
+            'filters': search_request.filters,
+            'sort_by': search_request.sort_by,
+            'took': 0,
+            'cache_hit': True
+        }
+        return self.formatter.format_search_response(
+            products, pagination, facets, query_info
+        )
+    
+    def _search_result(
+        self,
+        search_request: SearchRequest,
+        response: Dict[str, Any],
+        facets: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Format an Elasticsearch search response and cache it."""
+        products = ProductSearchService._process_products(response['hits']['hits'])
+        total = response['hits']['total']
+        pagination = ProductSearchService._build_pagination(
+            total['value'],
+            search_request.page,
+            search_request.per_page,
+            total.get('relation') == 'gte'
+        )
+        if facets is None:
+            facets = self.formatter.extract_facets(response.get('aggregations', {}))
+            self.facet_cache.set(ProductSearchService._facet_key(search_request), facets)
+        self.cache.set(ProductSearchService._cache_key(search_request), (products, pagination, facets))
+        query_info = {
+            'query': search_request.query,
+            'filters': search_request.filters,
+            'sort_by': search_request.sort_by,
+            'took': response.get('took', 0)
+        }
+        
+        return self.formatter.format_search_response(
+            products, pagination, facets, query_info
+        )
+    
+    def _search_error(self, search_error: Any) -> Dict[str, Any]:
+        """Format a failed search."""
+        return self.formatter.format_search_response(
+            [], 
+            self._empty_pagination(), 
+            {}, 
+            {'error': str(search_error)}
+        )
+    
+    @staticmethod
+    def _build_compare_query(product_name: str) -> Dict[str, Any]:
+        """Build the price comparison query."""
+        # Results are sorted by price only, so the match clauses run in
+        # filter context and skip scoring.
+        return {
+            "query": {
+                "constant_score": {
+                    "filter": {
+                        "bool": {
+                            "should": [
+                                {"match_phrase": {"name": product_name}},
+                                {
+                                    "match": {
+                                        "name": {
+                                            "query": product_name,
+                                            "operator": "and"
+                                        }
+                                    }
+                                },
+                                {
+                                    "match": {
+                                        "name": {
+                                            "query": product_name,
+                                            "fuzziness": "1"
+                                        }
+                                    }
+                                }
+                            ],
+                            "minimum_should_match": 1
+                        }
+                    }
+                }
+            },
+            "sort": [{"price": {"order": "asc"}}]
+        }
+    
+    @staticmethod
+    def _build_suggest_body(query: str, size: int) -> Dict[str, Any]:
+        """Build the completion suggester body."""
+        return {
+            "suggest": {
+                "product_suggest": {
+                    "prefix": query,
+                    "completion": {
+                        "field": "suggest",
+                        "size": size
+                    }
+                }
+            }
+        }
+    
+    @staticmethod
+    def _extract_suggestions(response: Dict[str, Any]) -> List[str]:
+        """Extract suggestion texts from a completion suggester response."""
+        return [
+            option['text']
+            for option in response['suggest']['product_suggest'][0]['options']
+        ]
+    
+    @staticmethod
+    def _cache_key(search_request: SearchRequest) -> Tuple:
+        """Build a hashable key from the normalized query and request parameters."""
+        # Only whitespace is normalized: the exact-term clause on name.raw is case sensitive
+        skeleton = ' '.join(search_request.query.split())
+        filters = tuple(sorted(
+            (field, tuple(value) if isinstance(value, list) else value)
+            for field, value in search_request.filters.items()
+        ))
+        fields = tuple(search_request.fields) if search_request.fields else None
+        return (skeleton, filters, search_request.sort_by, search_request.page, search_request.per_page, fields)
+    
+    @staticmethod
+    def _facet_key(search_request: SearchRequest) -> Tuple:
+        """Build a cache key for facets, which ignore sorting and pagination."""
+        return ProductSearchService._cache_key(search_request)[:2]
+    
     @staticmethod
     def _process_products(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process Elasticsearch hits into product list."""
@@ -579,13 +923,14 @@ class ProductSearchService:
         return products
     
     @staticmethod
-    def _build_pagination(total: int, page: int, per_page: int) -> Dict[str, Any]:
+    def _build_pagination(total: int, page: int, per_page: int, is_lower_bound: bool = False) -> Dict[str, Any]:
         """Build pagination metadata."""
         total_pages = (total + per_page - 1) // per_page
         return {
             'current_page': page,
             'per_page': per_page,
             'total_results': total,
+            'total_results_is_lower_bound': is_lower_bound,
             'total_pages': total_pages,
             'has_next': page < total_pages,
             'has_prev': page > 1
@@ -597,12 +942,30 @@ class ProductSearchService:
             'current_page': 1,
             'per_page': self.config.DEFAULT_PAGE_SIZE,
             'total_results': 0,
+            'total_results_is_lower_bound': False,
             'total_pages': 0,
             'has_next': False,
             'has_prev': False
         }
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype=self.mimetype
+        )
+
+
 # Flask Application with thin controllers
 def create_app(es_manager):
     """Create Flask application with dependency injection."""
@@ -610,8 +973,10 @@ def create_app(es_manager):
     CORS(app)
     
     # Configure Flask
-    app.config['JSON_AS_ASCII'] = False
-    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        app.json.ensure_ascii = False
     
     # Configure logging
     logging.basicConfig(
@@ -624,31 +989,96 @@ def create_app(es_manager):
     filter_parser = FilterParser()
     formatter = ResponseFormatter()
     
+    @app.after_request
+    def add_etag(response: Response) -> Response:
+        """Tag GET JSON responses with a body hash and answer If-None-Match with 304."""
+        if (request.method != 'GET' or response.status_code != 200
+                or response.is_streamed or response.mimetype != 'application/json'):
+            return response
+        
+        # Views whose bodies carry per-request fields hand over the stable part in g.etag_data
+        etag_data = g.get('etag_data')
+        body = response.get_data() if etag_data is None else app.json.dumps(etag_data).encode()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        response.set_etag(etag, weak=True)
+        cache_control = _CACHE_CONTROL.get(request.path)
+        if cache_control:
+            response.headers['Cache-Control'] = cache_control
+        return response.make_conditional(request)
+    
+    def parse_search_request(args) -> SearchRequest:
+        """Build a SearchRequest from query-string style parameters."""
+        sort_by = args.get('sort', 'relevance')
+        if sort_by not in _SORT_CONFIGS:
+            raise ValueError(f"'{sort_by}' is not a valid sort option")
+        
+        per_page = _int(args, 'per_page', SearchConfig.DEFAULT_PAGE_SIZE, 1, SearchConfig.MAX_PAGE_SIZE)
+        
+        return SearchRequest(
+            query=args.get('q', ''),
+            page=_int(args, 'page', 1, 1, max(1, SearchConfig.MAX_RESULT_WINDOW // per_page)),
+            per_page=per_page,
+            sort_by=sort_by,
+            filters=filter_parser.parse_filters(args),
+            fields=args['fields'].split(',') if args.get('fields') else None
+        )
+    
     @app.route('/api/search', methods=['GET'])
     def search_products():
         """Search products endpoint."""
         try:
-            search_request = SearchRequest(
-                query=request.args.get('q', ''),
-                page=max(1, int(request.args.get('page', 1))),
-                per_page=min(
-                    int(request.args.get('per_page', SearchConfig.DEFAULT_PAGE_SIZE)), 
-                    SearchConfig.MAX_PAGE_SIZE
-                ),
-                sort_by=SortOption(request.args.get('sort', 'relevance')),
-                filters=filter_parser.parse_filters(request.args)
-            )
+            search_request = parse_search_request(request.args)
         except (ValueError, KeyError) as invalidError:
             return formatter.format_error_response(f"Invalid parameters: {invalidError}", 400)
         
         results = search_service.search(search_request)
+        g.etag_data = _etag_payload(results)
+        return jsonify(results)
+    
+    @app.route('/api/search_with_suggest', methods=['GET'])
+    def search_with_suggest():
+        """Search products and get autocomplete suggestions in one call."""
+        try:
+            search_request = parse_search_request(request.args)
+        except (ValueError, KeyError) as invalidError:
+            return formatter.format_error_response(f"Invalid parameters: {invalidError}", 400)
+        size = _int(request.args, 'size', 10, 1, 20)
+        
+        results = search_service.search_with_suggestions(search_request, size)
+        g.etag_data = _etag_payload(results)
         return jsonify(results)
     
+    @app.route('/api/msearch', methods=['POST'])
+    def multi_search():
+        """Run several searches in one call."""
+        searches = request.get_json(silent=True)
+        if not isinstance(searches, list) or not searches:
+            return formatter.format_error_response('Expected a JSON array of searches', 400)
+        if len(searches) > SearchConfig.MAX_MSEARCH_SIZE:
+            return formatter.format_error_response(
+                f"At most {SearchConfig.MAX_MSEARCH_SIZE} searches per request", 400
+            )
+        
+        try:
+            search_requests = [
+                # Accept the same keys as /api/search, with lists for multi-value filters
+                parse_search_request({
+                    key: ','.join(map(str, value)) if isinstance(value, list) else str(value)
+                    for key, value in params.items()
+                })
+                for params in searches
+            ]
+        except (ValueError, KeyError, AttributeError) as invalidError:
+            return formatter.format_error_response(f"Invalid parameters: {invalidError}", 400)
+        
+        results = search_service.multi_search(search_requests)
+        return jsonify({'responses': results})
+    
     @app.route('/api/suggestions', methods=['GET'])
     def get_suggestions():
         """Get autocomplete suggestions."""
         query = request.args.get('q', '')
-        size = min(int(request.args.get('size', 10)), 20)
+        size = _int(request.args, 'size', 10, 1, 20)
         
         suggestions = search_service.get_suggestions(query, size)
         return jsonify({'suggestions': suggestions})
@@ -671,7 +1101,21 @@ def create_app(es_manager):
         if not product_name:
             return formatter.format_error_response('Product name is required', 400)
         
-        products = search_service.compare_prices(product_name)
+        if request.args.get('stream', '').lower() == 'true':
+            def generate():
+                try:
+                    for product in search_service.iter_compare_prices(product_name):
+                        yield app.json.dumps(product) + '\n'
+                except Exception as e:
+                    app.logger.error(f"Price comparison stream error: {e}")
+                    # The 200 status is already sent; a final error record tells the client the list is incomplete
+                    yield app.json.dumps({'error': str(e)}) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        limit = _int(request.args, 'limit', SearchConfig.COMPARE_DEFAULT_LIMIT, 1, SearchConfig.COMPARE_MAX_LIMIT)
+        
+        products = search_service.compare_prices(product_name, limit)
         return jsonify({'products': products})
     
     @app.route('/api/stats', methods=['GET'])
@@ -679,6 +1123,7 @@ def create_app(es_manager):
         """Get index statistics."""
         try:
             stats = search_service.get_stats()
+            g.etag_data = _etag_payload(stats)
             return jsonify(stats)
         except Exception as exception:
             return formatter.format_error_response(str(exception), 500)
@@ -693,7 +1138,7 @@ def create_app(es_manager):
             return jsonify({
                 'status': 'unhealthy',
                 'error': str(exception),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _now_iso()
             }), 500
     
     @app.route('/', methods=['GET'])
@@ -702,8 +1147,10 @@ def create_app(es_manager):
         endpoints = {
             'search': '/api/search?q=query&stores=ATB,Varus&page=1&per_page=200&sort=price_asc',
             'suggestions': '/api/suggestions?q=query&size=10',
+            'search_with_suggest': '/api/search_with_suggest?q=query&size=10',
+            'msearch': 'POST /api/msearch',
             'product': '/api/product/<product_id>',
-            'compare': '/api/compare?name=product_name',
+            'compare': '/api/compare?name=product_name&limit=200',
             'stats': '/api/stats',
             'health': '/api/health'
         }
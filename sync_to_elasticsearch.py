@@ -9,9 +9,11 @@ import logging
 import os
 import sqlite3
 import sys
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Iterator, Tuple
+from functools import partial
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 
 # Add project root to path
 sys.path.append(os.path.dirname(__file__))
@@ -26,6 +28,71 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Elasticsearch document fields read from the products table, in document order
+_ES_DOCUMENT_FIELDS = (
+    'name', 'price', 'store', 'category', 'subcategory', 'url',
+    'brand', 'description', 'image_url', 'original_price', 'discount_percentage',
+    'discount_amount', 'unit_price', 'rating', 'reviews_count', 'availability',
+    'stock_quantity', 'promo_tags', 'store_category', 'store_subcategory', 'scraped_at',
+)
+
+# SQL conversion of numeric fields, matching Python float()/int() on the stored value:
+# typed values are converted in SQL, while TEXT/BLOB values ('', '12 грн', '3.7' for an
+# int field) go through safe_float()/safe_int() and become NULL when they don't parse
+_FLOAT_SQL = ("CASE typeof({0}) WHEN 'real' THEN {0} WHEN 'integer' THEN CAST({0} AS REAL) "
+              "WHEN 'null' THEN NULL ELSE safe_float({0}) END")
+_INT_SQL = ("CASE typeof({0}) WHEN 'integer' THEN {0} WHEN 'real' THEN CAST({0} AS INTEGER) "
+            "WHEN 'null' THEN NULL ELSE safe_int({0}) END")
+
+_ES_NUMERIC_FIELDS = {
+    'price': _FLOAT_SQL,
+    'original_price': _FLOAT_SQL,
+    'discount_percentage': _FLOAT_SQL,
+    'discount_amount': _FLOAT_SQL,
+    'unit_price': _FLOAT_SQL,
+    'rating': _FLOAT_SQL,
+    'reviews_count': _INT_SQL,
+    'stock_quantity': _INT_SQL,
+}
+
+# Replacements for NULL (or unparseable) values of fields that are always present in the document
+_ES_FIELD_DEFAULTS = {
+    'price': '0.0',
+    'discount_percentage': '0.0',
+    'reviews_count': '0',
+}
+
+# Values for fields whose column doesn't exist in the products table
+_ES_MISSING_FIELD_DEFAULTS = dict(_ES_FIELD_DEFAULTS, availability="'unknown'")
+
+
+def _safe_float(value: Any) -> Optional[float]:
+    """float(value), or None if it doesn't parse; registered as the safe_float() SQL function."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _safe_int(value: Any) -> Optional[int]:
+    """int(value), or None if it doesn't parse; registered as the safe_int() SQL function."""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _md5hex(store: Optional[str], url: Optional[str]) -> Optional[str]:
+    """Stable product_id for rows without one, registered as the md5hex() SQL function."""
+    if store and url:
+        return hashlib.md5(f"{store}:{url}".encode()).hexdigest()
+    return None
+
+
 class SyncError(Exception):
     """Base exception for sync operations."""
     pass
@@ -44,45 +111,48 @@ class ElasticsearchError(SyncError):
 class SQLiteToElasticsearchSync:
     """Synchronize data from SQLite to Elasticsearch with optimized batch processing."""
     
-    def __init__(self, db_path: str = DATABASE_PATH, batch_size: int = 1000):
+    def __init__(self, db_path: str = DATABASE_PATH, batch_size: int = 1000,
+                 thread_count: Optional[int] = None, chunk_size: Optional[int] = None,
+                 max_chunk_bytes: Optional[int] = None):
         self.db_path = db_path
         self.es_manager = es_manager
         self.default_batch_size = batch_size
+        # Bulk settings passed to parallel_bulk; None falls back to the Elasticsearch config
+        self.thread_count = thread_count
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        # One connection for the lifetime of the sync; parallel_bulk reads it from a worker thread
+        self._conn = self._connect()
+        self._columns: Optional[frozenset] = None
+        self._projection: Optional[str] = None
+        
+    def sync_all_products(self, batch_size: int = None, recreate_index: bool = False,
+                          use_auto_id: bool = False) -> Dict[str, int]:
+        """Sync all products from SQLite to Elasticsearch.
         
-    def sync_all_products(self, batch_size: int = None, recreate_index: bool = False) -> Dict[str, int]:
-        """Sync all products from SQLite to Elasticsearch."""
+        With use_auto_id, Elasticsearch generates document ids instead of using product_id.
+        This makes an insert-only load faster, but the documents can no longer be fetched by
+        product_id or overwritten by later syncs, so only use it with recreate_index.
+        """
         batch_size = batch_size or self.default_batch_size
         logger.info("Starting full product synchronization...")
         
         try:
-            # Create/recreate index
-            if recreate_index:
-                logger.info("Recreating Elasticsearch index...")
-                if not self.es_manager.create_index(delete_existing=True):
-                    raise ElasticsearchError("Failed to create Elasticsearch index")
-            else:
-                self.es_manager.create_index(delete_existing=False)
-            
-            # Get total count
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) as total FROM products")
-                total_count = cursor.fetchone()['total']
-            
-            logger.info(f"Found {total_count} products to sync")
-            
-            stats = {"success": 0, "failed": 0, "total": total_count}
-            batch_num = 0
+            self._ensure_schema()
+            self.migrate_product_ids()
             
-            # Process batches using iterator
-            query = "SELECT * FROM products ORDER BY scraped_at DESC"
-            for batch in self._get_products_iterator(query, batch_size=batch_size):
-                batch_num += 1
-                logger.info(f"Processing batch {batch_num} ({len(batch)} products)")
-                
-                success, failed = self._process_products_batch(batch)
-                stats["success"] += success
-                stats["failed"] += failed
+            # Create/recreate index
+            created = self._prepare_index(recreate_index)
+            
+            # Stream converted documents straight into parallel bulk requests, in storage
+            # order: documents are indexed independently, so sorting would only delay the first batch
+            query = f"SELECT {self._get_projection()} FROM products"
+            products = self._get_products_iterator(query, batch_size=batch_size)
+            # Bulk-load settings (no replicas, refresh off) only on an index nobody searches yet
+            bulk_load = self.es_manager.bulk_load_settings(max_num_segments=5) if created else nullcontext()
+            with bulk_load:
+                success, failed = self._index_products(products, use_auto_id=use_auto_id)
+            stats = {"success": success, "failed": failed, "total": success + failed}
             
             logger.info(f"Sync complete: {stats['success']} successful, {stats['failed']} failed out of {stats['total']} total")
             return stats
@@ -94,89 +164,149 @@ class SQLiteToElasticsearchSync:
             logger.error(f"Unexpected sync error: {e}")
             raise SyncError(f"Sync failed: {e}") from e
     
+    def _prepare_index(self, recreate: bool = False) -> bool:
+        """Create (or recreate) the Elasticsearch index; returns True if a new, empty index was created."""
+        if recreate:
+            logger.info("Recreating Elasticsearch index...")
+            created = True
+        else:
+            created = not self.es_manager.es.indices.exists(index=self.es_manager.index_name)
+        
+        if not self.es_manager.create_index(delete_existing=recreate):
+            raise ElasticsearchError("Failed to create Elasticsearch index")
+        
+        if created:
+            # A new index holds none of the products logged as indexed
+            with self._get_db_connection() as conn:
+                with conn:
+                    conn.execute("DELETE FROM sync_log")
+        return created
+    
+    def _ensure_schema(self) -> None:
+        """Set up the WAL journal, query indexes and sync_log table the sync modes rely on."""
+        with self._get_db_connection() as conn:
+            # Persistent: lets the scraper keep writing while a sync reads
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                # Cover the WHERE clauses of the recent and store syncs
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_products_scraped_at ON products(scraped_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_products_store ON products(store)")
+                # Last time each product was indexed by a recent sync
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS sync_log (
+                        product_id TEXT PRIMARY KEY,
+                        indexed_at TEXT NOT NULL
+                    ) WITHOUT ROWID
+                """)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared connection tuned for long sequential reads."""
+        try:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # Default tuple rows: counts are read positionally and the bulk iterator zips
+            # tuples with column names, so no query needs sqlite3.Row.
+            # Connection-scoped settings only; schema changes live in _ensure_schema()
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.create_function("md5hex", 2, _md5hex, deterministic=True)
+            conn.create_function("safe_float", 1, _safe_float, deterministic=True)
+            conn.create_function("safe_int", 1, _safe_int, deterministic=True)
+            return conn
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise DatabaseError(f"Database connection failed: {e}") from e
+    
+    def close(self) -> None:
+        """Close the shared database connection."""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+    
     @contextmanager
     def _get_db_connection(self):
-        """Context manager for database connections."""
-        conn = None
+        """Context manager yielding the shared database connection."""
+        if self._conn is None:
+            self._conn = self._connect()
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            yield conn
+            yield self._conn
         except sqlite3.Error as e:
             logger.error(f"Database error: {e}")
-            raise DatabaseError(f"Database connection failed: {e}") from e
-        finally:
-            if conn:
-                conn.close()
+            raise DatabaseError(f"Database query failed: {e}") from e
     
-    def _process_products_batch(self, products: List[Dict[str, Any]]) -> Tuple[int, int]:
-        """Process a batch of products and return success/failure counts."""
-        if not products:
-            return 0, 0
-        
-        es_docs = [self._convert_to_es_document(product) for product in products]
-        success, failed = self.es_manager.bulk_index_products(es_docs)
+    def _index_products(self, products: Iterator[Dict[str, Any]], use_auto_id: bool = False,
+                        indexed_ids: Optional[List[str]] = None) -> Tuple[int, int]:
+        """Index a stream of documents with parallel bulk requests and return success/failure counts."""
+        success, failed = self.es_manager.parallel_bulk_index_products(
+            products,
+            thread_count=self.thread_count,
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            use_auto_id=use_auto_id,
+            indexed_ids=indexed_ids
+        )
         return success, len(failed)
     
-    def _get_products_iterator(self, query: str, params: tuple = (), batch_size: int = None) -> Iterator[List[Dict[str, Any]]]:
-        """Get an iterator that yields batches of products from the database."""
+    def _get_products_iterator(self, query: str, params: tuple = (), batch_size: int = None) -> Iterator[Dict[str, Any]]:
+        """Get an iterator that yields Elasticsearch documents converted from database rows."""
         batch_size = batch_size or self.default_batch_size
         
         with self._get_db_connection() as conn:
             cursor = conn.cursor()
+            cursor.arraysize = batch_size
             cursor.execute(query, params)
-            
-            batch = []
-            for row in cursor:
-                batch.append(dict(row))
-                
-                if len(batch) >= batch_size:
-                    yield batch
-                    batch = []
-            
-            if batch:
-                yield batch
+            columns = [column[0] for column in cursor.description]
+            convert = self._convert_to_es_document
+            
+            read = 0
+            for batch_num, rows in enumerate(iter(partial(cursor.fetchmany, batch_size), []), 1):
+                read += len(rows)
+                logger.info(f"Processing batch {batch_num} ({len(rows)} products, {read} so far)")
+                for row in rows:
+                    yield convert(zip(columns, row))
     
     def sync_recent_products(self, hours: int = 24, batch_size: int = None) -> Dict[str, int]:
-        """Sync products updated in the last N hours."""
+        """Sync products updated in the last N hours.
+        
+        Products whose scraped_at is not newer than the last time a recent sync indexed
+        them (recorded in the sync_log table) are skipped.
+        """
         batch_size = batch_size or self.default_batch_size
         logger.info(f"Syncing products updated in last {hours} hours...")
         
         try:
+            self._ensure_schema()
+            self.migrate_product_ids()
+            
             # Create index if it doesn't exist
-            self.es_manager.create_index(delete_existing=False)
+            self._prepare_index()
             
             # Calculate cutoff time using timedelta for better accuracy
             cutoff_time = datetime.now() - timedelta(hours=hours)
             cutoff_str = cutoff_time.isoformat()
             
-            # Get recent products count
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT COUNT(*) as total FROM products 
-                    WHERE scraped_at >= ? OR scraped_at IS NULL
-                """, (cutoff_str,))
-                total_count = cursor.fetchone()['total']
-            
-            logger.info(f"Found {total_count} recent products to sync")
-            
-            stats = {"success": 0, "failed": 0, "total": total_count}
-            batch_num = 0
-            
-            # Process batches using iterator
-            query = """
-                SELECT * FROM products 
-                WHERE scraped_at >= ? OR scraped_at IS NULL
-                ORDER BY scraped_at DESC
+            # Stream converted documents straight into parallel bulk requests, in storage
+            # order: documents are indexed independently, so sorting would only delay the first batch
+            query = f"""
+                SELECT {self._get_projection()} FROM products 
+                WHERE (scraped_at >= ? OR scraped_at IS NULL)
+                AND NOT EXISTS (
+                    SELECT 1 FROM sync_log
+                    WHERE sync_log.product_id = {self._get_product_id_expr()}
+                    AND datetime(sync_log.indexed_at) > datetime(products.scraped_at)
+                )
             """
-            for batch in self._get_products_iterator(query, (cutoff_str,), batch_size):
-                batch_num += 1
-                logger.info(f"Processing recent batch {batch_num} ({len(batch)} products)")
-                
-                success, failed = self._process_products_batch(batch)
-                stats["success"] += success
-                stats["failed"] += failed
+            # Taken before reading, so rows scraped during the sync are picked up next time.
+            # Local time like the scrapers' scraped_at; both sides are normalized with datetime()
+            # since scraped_at may be ISO ('T') or SQLite ('YYYY-MM-DD HH:MM:SS') formatted, and
+            # the strict > re-indexes rows scraped in the same second the sync started.
+            started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            products = self._get_products_iterator(query, (cutoff_str,), batch_size)
+            indexed_ids = []
+            success, failed = self._index_products(products, indexed_ids=indexed_ids)
+            self._record_indexed(indexed_ids, started_at)
+            stats = {"success": success, "failed": failed, "total": success + failed}
             
             logger.info(f"Recent sync complete: {stats['success']} successful, {stats['failed']} failed")
             return stats
@@ -194,29 +324,18 @@ class SQLiteToElasticsearchSync:
         logger.info(f"Syncing products from {store_name}...")
         
         try:
-            # Create index if it doesn't exist
-            self.es_manager.create_index(delete_existing=False)
+            self._ensure_schema()
+            self.migrate_product_ids()
             
-            # Get store products count
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) as total FROM products WHERE store = ?", (store_name,))
-                total_count = cursor.fetchone()['total']
-            
-            logger.info(f"Found {total_count} products from {store_name}")
+            # Create index if it doesn't exist
+            self._prepare_index()
             
-            stats = {"success": 0, "failed": 0, "total": total_count}
-            batch_num = 0
-            
-            # Process batches using iterator
-            query = "SELECT * FROM products WHERE store = ? ORDER BY scraped_at DESC"
-            for batch in self._get_products_iterator(query, (store_name,), batch_size):
-                batch_num += 1
-                logger.info(f"Processing store batch {batch_num} ({len(batch)} products)")
-                
-                success, failed = self._process_products_batch(batch)
-                stats["success"] += success
-                stats["failed"] += failed
+            # Stream converted documents straight into parallel bulk requests, in storage
+            # order: documents are indexed independently, so sorting would only delay the first batch
+            query = f"SELECT {self._get_projection()} FROM products WHERE store = ?"
+            products = self._get_products_iterator(query, (store_name,), batch_size)
+            success, failed = self._index_products(products)
+            stats = {"success": success, "failed": failed, "total": success + failed}
             
             logger.info(f"Store sync complete: {stats['success']} successful, {stats['failed']} failed")
             return stats
@@ -230,113 +349,135 @@ class SQLiteToElasticsearchSync:
     
     
     @staticmethod
-    def _convert_to_es_document(sqlite_row: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert SQLite row to Elasticsearch document with proper type conversion.
+    def _convert_to_es_document(fields: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Convert a projected SQLite row to an Elasticsearch document.
+        
+        Type conversion, defaults and product_id generation already happen in the
+        SELECT built by _get_projection, so only NULL columns are dropped here.
         
         Args:
-            sqlite_row: Dictionary containing SQLite row data
+            fields: (column, value) pairs of a row selected with _get_projection
             
         Returns:
             Dictionary formatted for Elasticsearch indexing
         """
-        # Generate product_id if not present
-        if not sqlite_row.get('product_id'):
-            store = sqlite_row.get('store', '')
-            url = sqlite_row.get('url', '')
-            if store and url:
-                sqlite_row['product_id'] = hashlib.md5(f"{store}:{url}".encode()).hexdigest()
+        return {k: v for k, v in fields if v is not None}
+    
+    def _get_columns(self) -> frozenset:
+        """Column names of the products table, read once."""
+        if self._columns is None:
+            with self._get_db_connection() as conn:
+                self._columns = frozenset(row[1] for row in conn.execute("PRAGMA table_info(products)"))
+        return self._columns
+    
+    def migrate_product_ids(self) -> int:
+        """Store generated product_ids for rows that lack one, so syncs never hash them again.
         
-        # Helper function for safe numeric conversion
-        def safe_float(value: Any) -> Optional[float]:
-            if value is None or value == '':
-                return None
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                return None
+        Returns:
+            Number of rows updated (0 once every row has an id, or if there is no product_id column)
+        """
+        if 'product_id' not in self._get_columns():
+            return 0
         
-        def safe_int(value: Any) -> Optional[int]:
-            if value is None or value == '':
-                return None
-            try:
-                return int(value)
-            except (ValueError, TypeError):
-                return None
+        with self._get_db_connection() as conn:
+            with conn:
+                cursor = conn.execute("""
+                    UPDATE products SET product_id = md5hex(store, url)
+                    WHERE (product_id IS NULL OR product_id = '') AND store != '' AND url != ''
+                """)
         
-        # Map SQLite fields to Elasticsearch document
-        doc = {
-            # Core fields
-            'product_id': sqlite_row.get('product_id'),
-            'name': sqlite_row.get('name'),
-            'price': safe_float(sqlite_row.get('price')) or 0.0,
-            'store': sqlite_row.get('store'),
-            'category': sqlite_row.get('category'),
-            'subcategory': sqlite_row.get('subcategory'),
-            'url': sqlite_row.get('url'),
-            
-            # Extended fields (may not exist in all records)
-            'brand': sqlite_row.get('brand'),
-            'description': sqlite_row.get('description'),
-            'image_url': sqlite_row.get('image_url'),
-            'original_price': safe_float(sqlite_row.get('original_price')),
-            'discount_percentage': safe_float(sqlite_row.get('discount_percentage')) or 0.0,
-            'discount_amount': safe_float(sqlite_row.get('discount_amount')),
-            'unit_price': safe_float(sqlite_row.get('unit_price')),
-            'rating': safe_float(sqlite_row.get('rating')),
-            'reviews_count': safe_int(sqlite_row.get('reviews_count')) or 0,
-            'availability': sqlite_row.get('availability', 'unknown'),
-            'stock_quantity': safe_int(sqlite_row.get('stock_quantity')),
-            'promo_tags': sqlite_row.get('promo_tags'),
-            'store_category': sqlite_row.get('store_category'),
-            'store_subcategory': sqlite_row.get('store_subcategory'),
-            
-            # Timestamps
-            'scraped_at': sqlite_row.get('scraped_at'),
-            'created_at': sqlite_row.get('scraped_at'),  # Use scraped_at as created_at
+        if cursor.rowcount:
+            logger.info(f"Generated product_id for {cursor.rowcount} products")
+        return cursor.rowcount
+    
+    def _get_product_id_expr(self) -> str:
+        """SQL expression for a row's product_id, qualified so it also works inside subqueries."""
+        generated = "md5hex(products.store, products.url)"
+        if 'product_id' in self._get_columns():
+            return f"COALESCE(NULLIF(products.product_id, ''), {generated})"
+        return generated
+    
+    def _record_indexed(self, product_ids: List[str], indexed_at: str) -> None:
+        """Remember when products were last indexed, so recent syncs can skip unchanged ones."""
+        with self._get_db_connection() as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sync_log (product_id, indexed_at) VALUES (?, ?)",
+                    ((product_id, indexed_at) for product_id in product_ids if product_id)
+                )
+    
+    def _get_projection(self) -> str:
+        """Build (once) the SELECT list that maps product columns to Elasticsearch fields."""
+        if self._projection is None:
+            columns = self._get_columns()
+            
+            select = [f"{self._get_product_id_expr()} AS product_id"]
+            
+            for field in _ES_DOCUMENT_FIELDS:
+                if field not in columns:
+                    default = _ES_MISSING_FIELD_DEFAULTS.get(field)
+                    if default is not None:
+                        select.append(f"{default} AS {field}")
+                    continue
+                
+                # A column's declared type doesn't guarantee the stored type (a REAL column
+                # keeps '' or 'abc' as TEXT), so the conversion dispatches on each value's type
+                conversion = _ES_NUMERIC_FIELDS.get(field)
+                expr = conversion.format(field) if conversion else field
+                default = _ES_FIELD_DEFAULTS.get(field)
+                if default is not None:
+                    expr = f"COALESCE({expr}, {default})"
+                select.append(field if expr == field else f"{expr} AS {field}")
+            
+            if 'scraped_at' in columns:
+                select.append("scraped_at AS created_at")  # Use scraped_at as created_at
+            
+            self._projection = ', '.join(select)
+        return self._projection
+    
+    def _get_sqlite_store_counts(self) -> Dict[str, int]:
+        """Product counts per store in SQLite."""
+        with self._get_db_connection() as conn:
+            return dict(conn.execute("SELECT store, COUNT(*) as count FROM products GROUP BY store").fetchall())
+    
+    def _get_es_store_counts(self) -> Tuple[int, Dict[str, int]]:
+        """Total and per-store document counts in Elasticsearch, from one cached size-0 search."""
+        agg_query = {
+            "size": 0,
+            "track_total_hits": True,
+            "aggs": {
+                "stores": {
+                    "terms": {
+                        "field": "store",
+                        "size": 10
+                    }
+                }
+            }
         }
         
-        # Remove None values to keep the document clean
-        return {k: v for k, v in doc.items() if v is not None}
+        es_agg_result = self.es_manager.es.search(
+            index=self.es_manager.index_name,
+            body=agg_query,
+            request_cache=True
+        )
+        
+        es_by_store = {}
+        if 'aggregations' in es_agg_result:
+            for bucket in es_agg_result['aggregations']['stores']['buckets']:
+                es_by_store[bucket['key']] = bucket['doc_count']
+        return es_agg_result['hits']['total']['value'], es_by_store
     
     def get_sync_status(self) -> Dict[str, Any]:
         """Get synchronization status and statistics."""
         try:
-            # SQLite stats
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("SELECT COUNT(*) as total FROM products")
-                sqlite_total = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT store, COUNT(*) as count FROM products GROUP BY store")
-                sqlite_by_store = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Elasticsearch stats
-            es_stats = self.es_manager.es.count(index=self.es_manager.index_name)
-            es_total = es_stats.get('count', 0)
-            
-            # Store breakdown in Elasticsearch
-            agg_query = {
-                "size": 0,
-                "aggs": {
-                    "stores": {
-                        "terms": {
-                            "field": "store",
-                            "size": 10
-                        }
-                    }
-                }
-            }
+            # SQLite and Elasticsearch are queried concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                sqlite_future = executor.submit(self._get_sqlite_store_counts)
+                es_future = executor.submit(self._get_es_store_counts)
+                sqlite_by_store = sqlite_future.result()
+                es_total, es_by_store = es_future.result()
             
-            es_agg_result = self.es_manager.es.search(
-                index=self.es_manager.index_name,
-                body=agg_query
-            )
-            
-            es_by_store = {}
-            if 'aggregations' in es_agg_result:
-                for bucket in es_agg_result['aggregations']['stores']['buckets']:
-                    es_by_store[bucket['key']] = bucket['doc_count']
+            sqlite_total = sum(sqlite_by_store.values())
             
             return {
                 "sqlite": {
@@ -394,6 +535,28 @@ Examples:
         default=1000,
         help="Batch size for processing (default: %(default)s)"
     )
+    parser.add_argument(
+        "--auto-id", 
+        action="store_true",
+        help="Let Elasticsearch generate document ids in --mode=all (requires --recreate-index; "
+             "products can then no longer be fetched by product_id)"
+    )
+    parser.add_argument(
+        "--thread-count", 
+        type=int, 
+        help="Concurrent bulk requests (default: ELASTICSEARCH_BULK_THREADS or CPU count)"
+    )
+    parser.add_argument(
+        "--chunk-size", 
+        type=int, 
+        help="Documents per bulk request (default: ELASTICSEARCH_BULK_CHUNK_SIZE); "
+             "keep it below max-chunk-bytes / average document size"
+    )
+    parser.add_argument(
+        "--max-chunk-bytes", 
+        type=int, 
+        help="Maximum bulk request size in bytes (default: ELASTICSEARCH_BULK_MAX_CHUNK_BYTES, 50 MiB)"
+    )
     parser.add_argument(
         "--recreate-index", 
         action="store_true",
@@ -402,14 +565,24 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.auto_id and not (args.mode == "all" and args.recreate_index):
+        parser.error("--auto-id requires --mode=all --recreate-index")
+    
+    sync = None
     try:
-        sync = SQLiteToElasticsearchSync(batch_size=args.batch_size)
+        sync = SQLiteToElasticsearchSync(
+            batch_size=args.batch_size,
+            thread_count=args.thread_count,
+            chunk_size=args.chunk_size,
+            max_chunk_bytes=args.max_chunk_bytes
+        )
         
         if args.mode == "all":
             print("Syncing all products...")
             result = sync.sync_all_products(
                 batch_size=args.batch_size,
-                recreate_index=args.recreate_index
+                recreate_index=args.recreate_index,
+                use_auto_id=args.auto_id
             )
             print(f"Result: {result}")
             
@@ -465,6 +638,9 @@ Examples:
         logger.exception(f"Unexpected error: {e}")
         print(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        if sync:
+            sync.close()
 
 
 if __name__ == "__main__":